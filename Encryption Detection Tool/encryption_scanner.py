@@ -0,0 +1,426 @@
+import os
+import re
+import csv
+import sys
+import math
+import time
+import errno
+import queue
+import shutil
+import socket
+import fnmatch
+import hashlib
+import logging
+import argparse
+import platform
+import threading
+from collections import Counter
+from datetime import datetime
+
+# File name rules, checked together in one pass over every directory (case-insensitive, like Windows)
+RULES = [
+    ("bitlocker_key", "BitLocker recovery key", "BitLocker*Recovery*Key*.txt"),
+    ("veracrypt_container", "VeraCrypt container", "*.hc"),
+    ("truecrypt_container", "TrueCrypt container", "*.tc"),
+    ("veracrypt_config", "VeraCrypt config", "veracrypt.xml"),
+]
+ENTROPY_KIND = ("possible_container", "Possible encrypted container (high entropy)")
+LABELS = dict([(kind, label) for kind, label, _ in RULES] + [ENTROPY_KIND])
+HEADINGS = {
+    "bitlocker_key": "BITLOCKER RECOVERY KEYS",
+    "veracrypt_container": "VERACRYPT CONTAINERS",
+    "truecrypt_container": "TRUECRYPT CONTAINERS",
+    "veracrypt_config": "VERACRYPT CONFIGS",
+    "possible_container": "POSSIBLE ENCRYPTED CONTAINERS (HIGH ENTROPY, NO KNOWN NAME)",
+}
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+# VeraCrypt/TrueCrypt volumes are a whole number of 512-byte sectors and at least this big
+# (the smallest FAT volume VeraCrypt will create)
+VOLUME_ALIGNMENT = 512
+MIN_VOLUME_SIZE = 292 * 1024
+# Bytes read at the start, middle and end of a candidate; the start and end hold the volume
+# headers, which are indistinguishable from random data when the volume is encrypted
+SAMPLE_SIZE = 4096
+# Bits per byte; a 4 KiB sample of random data measures about 7.95
+ENTROPY_THRESHOLD = 7.9
+# Formats that are high-entropy by nature (compressed or media), recognised by their first bytes
+KNOWN_SIGNATURES = (
+    b"PK\x03\x04", b"PK\x05\x06", b"\x1f\x8b", b"7z\xbc\xaf\x27\x1c", b"Rar!", b"\xfd7zXZ", b"BZh",
+    b"\x28\xb5\x2f\xfd", b"%PDF", b"\xff\xd8\xff", b"\x89PNG", b"GIF8", b"RIFF", b"OggS", b"fLaC", b"ID3",
+    b"\x1a\x45\xdf\xa3", b"\xd0\xcf\x11\xe0", b"SQLite format 3", b"MSCF", b"\x4d\x5a", b"\x7fELF", b"-----BEGIN",
+    b"\x00\x00\x01\xba", b"ITSF", b"\xed\xab\xee\xdb", b"LUKS\xba\xbe", b"KDMV", b"vhdxfile", b"conectix", b"EVF",
+)
+# ISO base media files (mp4, mov, heic) carry "ftyp" after a 4-byte box size
+KNOWN_SIGNATURE_AT_4 = (b"ftyp", b"moov", b"mdat", b"free", b"wide")
+
+
+def export_labels(roots):
+    # Folder under exported_keys for each root: the root's own name, plus a short hash of its full
+    # path when another root has the same name (D:\evidence and E:\evidence), so copies from
+    # different roots can never overwrite each other. Compared without case, since the export
+    # drive is often FAT or NTFS.
+    names = {root: os.path.basename(root.rstrip("\\/")) or root.strip(":\\/") or "root" for root in roots}
+    counts = Counter(name.lower() for name in names.values())
+    labels = {}
+    for root, name in names.items():
+        if counts[name.lower()] > 1:
+            name = f"{name}_{hashlib.sha1(root.encode('utf-8')).hexdigest()[:8]}"
+        labels[root] = name
+    return labels
+
+
+def setup_logging(log_path):
+    logging.basicConfig(
+        filename=log_path,
+        filemode='a',
+        format='%(asctime)s [%(levelname)s]: %(message)s',
+        level=logging.INFO
+    )
+    return logging.getLogger("EncryptionScanLogger")
+
+
+def compile_rules(rules=RULES):
+    # One alternation of all patterns, so each file name is tested once, not once per rule
+    parts = [f"(?P<{kind}>{fnmatch.translate(pattern)})" for kind, _, pattern in rules]
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+def shannon_entropy(data):
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(count / total * math.log2(count / total) for count in Counter(data).values())
+
+
+def read_at(fd, size, offset):
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def sample_entropy(path, size):
+    # Lowest entropy among the header, middle and trailer samples, or None when the file is a
+    # known format. Reads at most three small blocks, never the whole file.
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        head = read_at(fd, SAMPLE_SIZE, 0)
+        if head.startswith(KNOWN_SIGNATURES) or head[4:8] in KNOWN_SIGNATURE_AT_4:
+            return None
+        samples = [head, read_at(fd, SAMPLE_SIZE, (size // 2) // VOLUME_ALIGNMENT * VOLUME_ALIGNMENT),
+                   read_at(fd, SAMPLE_SIZE, max(0, size - SAMPLE_SIZE))]
+    finally:
+        os.close(fd)
+    return min(shannon_entropy(sample) for sample in samples)
+
+
+def hash_file(path):
+    hash_md5 = hashlib.md5()
+    hash_sha256 = hashlib.sha256()
+    with open(path, 'rb', buffering=0) as f:
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hash_md5.update(view[:read])
+            hash_sha256.update(view[:read])
+    return hash_md5.hexdigest(), hash_sha256.hexdigest()
+
+
+def copy_file(source, destination):
+    # Copies inside the kernel where the OS allows it: copy_file_range first (no data passes
+    # through this process, and some file systems clone instead of copying), then sendfile,
+    # then an ordinary buffered copy. Returns the method that finished the copy.
+    method = "copy"
+    with open(source, 'rb') as fsrc, open(destination, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = 0
+        for name, step in (("copy_file_range", _copy_range_step), ("sendfile", _sendfile_step)):
+            if copied >= size or not hasattr(os, name):
+                continue
+            try:
+                while copied < size:
+                    sent = step(fsrc.fileno(), fdst.fileno(), copied, min(size - copied, COPY_CHUNK_SIZE))
+                    if not sent:
+                        break
+                    copied += sent
+                    method = name
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP,
+                                   errno.EBADF, errno.EPERM):
+                    raise
+        if copied < size:
+            fsrc.seek(copied)
+            fdst.seek(copied)
+            shutil.copyfileobj(fsrc, fdst, COPY_CHUNK_SIZE)
+            method = "copy" if not copied else method + "+copy"
+    shutil.copystat(source, destination)
+    return method
+
+
+def _copy_range_step(src_fd, dst_fd, offset, count):
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile_step(src_fd, dst_fd, offset, count):
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+class EncryptionScanner:
+    # Walks the roots once with a pool of threads, each listing one directory at a time with
+    # os.scandir and queueing its subdirectories for the others. Every file name is tested
+    # against all rules in the same pass. Matches go to separate hashing and copying queues,
+    # so a multi-gigabyte container being copied never holds up the walk, and the optional
+    # entropy check reads small samples of size-aligned files on its own queue as well.
+    def __init__(self, roots, export_dir=None, walkers=8, hashers=2, copiers=2, hash_files=True, entropy=False,
+                 min_size=MIN_VOLUME_SIZE, one_file_system=False, quiet=False, logger=None):
+        # A root given twice would be walked and exported twice
+        self.roots = list(dict.fromkeys(os.path.abspath(root) for root in roots))
+        self.labels = export_labels(self.roots)
+        self.export_dir = os.path.abspath(export_dir) if export_dir else None
+        self.walkers = max(1, walkers)
+        self.hashers = max(1, hashers) if hash_files else 0
+        self.copiers = max(1, copiers) if export_dir else 0
+        self.entropy = entropy
+        self.min_size = min_size
+        self.one_file_system = one_file_system
+        self.quiet = quiet
+        self.logger = logger or logging.getLogger("EncryptionScanLogger")
+        self.pattern = compile_rules()
+        self.findings = []
+        self.lock = threading.Lock()
+        self.stats = {'directories': 0, 'files': 0, 'errors': 0, 'sampled': 0, 'copied_bytes': 0}
+        self.dir_queue = queue.Queue()
+        self.hash_queue = queue.Queue()
+        self.copy_queue = queue.Queue()
+        self.sample_queue = queue.Queue()
+        self.skip = {os.path.normcase(self.export_dir)} if self.export_dir else set()
+
+    def run(self):
+        start = time.time()
+        workers = [self._start(self._hash_worker, self.hash_queue) for _ in range(self.hashers)]
+        workers += [self._start(self._copy_worker, self.copy_queue) for _ in range(self.copiers)]
+        workers += [self._start(self._sample_worker, self.sample_queue) for _ in range(self.hashers or 1)
+                    if self.entropy]
+        walkers = [self._start(self._walk_worker, self.dir_queue) for _ in range(self.walkers)]
+        for root in self.roots:
+            try:
+                device = os.stat(root).st_dev
+            except OSError as e:
+                self._error(f"Cannot open {root}: {e}")
+                continue
+            self.dir_queue.put((root, root, device))
+        # Every directory is queued before its parent is marked done, so join() returns only
+        # after the whole tree has been listed
+        self.dir_queue.join()
+        self.walk_seconds = time.time() - start
+        self.logger.info(f"Walk finished: {self.stats['directories']} directories, {self.stats['files']} files "
+                         f"in {self.walk_seconds:.2f} seconds")
+        for _ in walkers:
+            self.dir_queue.put(None)
+        # Entropy candidates can still turn into findings that need hashing and copying
+        self.sample_queue.join()
+        for worker_queue in (self.sample_queue, self.hash_queue, self.copy_queue):
+            worker_queue.join()
+        for thread, worker_queue in workers:
+            worker_queue.put(None)
+        for thread, _ in walkers + workers:
+            thread.join()
+        self.elapsed = time.time() - start
+        self.findings.sort(key=lambda finding: (finding['kind'], finding['path']))
+        return self.findings
+
+    def _start(self, target, work_queue):
+        thread = threading.Thread(target=self._serve, args=(target, work_queue), daemon=True)
+        thread.start()
+        return thread, work_queue
+
+    def _serve(self, target, work_queue):
+        while True:
+            item = work_queue.get()
+            try:
+                if item is None:
+                    return
+                target(*item)
+            except Exception as e:
+                path = item[0]['path'] if isinstance(item[0], dict) else item[0]
+                self._error(f"{target.__name__.strip('_')} failed for {path}: {e}")
+            finally:
+                work_queue.task_done()
+
+    def _error(self, message):
+        with self.lock:
+            self.stats['errors'] += 1
+        self.logger.error(message)
+
+    def _walk_worker(self, directory, root, device):
+        files = 0
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if os.path.normcase(entry.path) in self.skip:
+                                continue
+                            if self.one_file_system and entry.stat(follow_symlinks=False).st_dev != device:
+                                continue
+                            self.dir_queue.put((entry.path, root, device))
+                        elif entry.is_file(follow_symlinks=False):
+                            files += 1
+                            self._check_file(entry, root)
+                    except OSError as e:
+                        self._error(f"Cannot read {entry.path}: {e}")
+        except OSError as e:
+            self._error(f"Cannot list {directory}: {e}")
+        with self.lock:
+            self.stats['directories'] += 1
+            self.stats['files'] += files
+
+    def _check_file(self, entry, root):
+        match = self.pattern.match(entry.name)
+        if match:
+            self._add_finding(match.lastgroup, entry.path, root, entry.stat(follow_symlinks=False))
+        elif self.entropy:
+            st = entry.stat(follow_symlinks=False)
+            if st.st_size >= self.min_size and st.st_size % VOLUME_ALIGNMENT == 0:
+                self.sample_queue.put((entry.path, root, st))
+
+    def _add_finding(self, kind, path, root, st, entropy=None):
+        finding = {
+            'kind': kind,
+            'path': path,
+            'size': st.st_size,
+            'modified': datetime.fromtimestamp(st.st_mtime).isoformat(sep=' ', timespec='seconds'),
+            'entropy': "" if entropy is None else f"{entropy:.3f}",
+            'md5': "",
+            'sha256': "",
+            'copied_to': "",
+        }
+        with self.lock:
+            self.findings.append(finding)
+        self.logger.info(f"Found {LABELS[kind]}: {path}")
+        if not self.quiet:
+            print(f"Found {LABELS[kind]}: {path}")
+        if self.hashers:
+            self.hash_queue.put((finding,))
+        if self.copiers:
+            self.copy_queue.put((finding, root))
+
+    def _sample_worker(self, path, root, st):
+        entropy = sample_entropy(path, st.st_size)
+        with self.lock:
+            self.stats['sampled'] += 1
+        if entropy is not None and entropy >= ENTROPY_THRESHOLD:
+            self._add_finding(ENTROPY_KIND[0], path, root, st, entropy)
+
+    def _hash_worker(self, finding):
+        finding['md5'], finding['sha256'] = hash_file(finding['path'])
+
+    def _copy_worker(self, finding, root):
+        # The tree below each root is kept, so files with the same name cannot overwrite each other
+        destination = os.path.join(self.export_dir, self.labels[root], os.path.relpath(finding['path'], root))
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        method = copy_file(finding['path'], destination)
+        finding['copied_to'] = destination
+        with self.lock:
+            self.stats['copied_bytes'] += finding['size']
+        self.logger.info(f"Copied {finding['path']} to {destination} ({method})")
+
+
+def write_findings_csv(findings, filename):
+    columns = ["kind", "path", "size", "modified", "entropy", "md5", "sha256", "copied_to"]
+    with open(filename, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(findings)
+
+
+def write_report(scanner, filename, started):
+    user = os.environ.get('USERNAME') or os.environ.get('USER')
+    lines = [
+        "======== BITLOCKER/VERACRYPT/TRUECRYPT TRIAGE REPORT ========",
+        f"Start Time: {started}",
+        f"Hostname: {socket.gethostname()}",
+        f"Username: {user}",
+        f"Platform: {platform.platform()}",
+        f"Scanned: {', '.join(scanner.roots)}",
+        f"Directories: {scanner.stats['directories']}  Files: {scanner.stats['files']}  "
+        f"Errors: {scanner.stats['errors']}",
+    ]
+    if scanner.entropy:
+        lines.append(f"Files sampled for entropy: {scanner.stats['sampled']}")
+    for kind in [kind for kind, _, _ in RULES] + [ENTROPY_KIND[0]]:
+        found = [finding for finding in scanner.findings if finding['kind'] == kind]
+        if kind == ENTROPY_KIND[0] and not scanner.entropy:
+            continue
+        lines.append(f"======== {HEADINGS[kind]} ({len(found)}) ========")
+        for finding in found:
+            details = f"{finding['size']} bytes, modified {finding['modified']}"
+            if finding['entropy']:
+                details += f", entropy {finding['entropy']}"
+            if finding['sha256']:
+                details += f", SHA-256 {finding['sha256']}"
+            lines.append(f"{finding['path']}  ({details})")
+    lines.append(f"End Time: {datetime.now().isoformat(sep=' ', timespec='seconds')}")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="encryption_scanner",
+        description="Find BitLocker recovery keys and VeraCrypt/TrueCrypt containers and configs in mounted "
+                    "images or directory trees, in a single parallel pass.")
+    parser.add_argument("roots", nargs="+", help="Folders, drives or mount points to scan.")
+    parser.add_argument("-o", "--output", default="encryption_scan",
+                        help="Folder for the report, findings.csv, the log and exported files (default: %(default)s).")
+    parser.add_argument("--no-copy", action="store_true", help="Only list and hash findings; do not export them.")
+    parser.add_argument("--no-hash", action="store_true", help="Do not compute MD5/SHA-256 of findings.")
+    parser.add_argument("--entropy", action="store_true",
+                        help="Also flag files of any name whose size fits a VeraCrypt volume and whose header, "
+                             "middle and end samples look random.")
+    parser.add_argument("--min-size", type=int, default=MIN_VOLUME_SIZE,
+                        help="Smallest file checked by --entropy, in bytes (default: %(default)s).")
+    parser.add_argument("--walkers", type=int, default=8, help="Threads listing directories (default: %(default)s).")
+    parser.add_argument("--hashers", type=int, default=2, help="Threads hashing findings (default: %(default)s).")
+    parser.add_argument("--copiers", type=int, default=2, help="Threads exporting findings (default: %(default)s).")
+    parser.add_argument("--one-file-system", action="store_true",
+                        help="Do not descend into other file systems mounted below a root.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Do not print findings as they are found.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.makedirs(args.output, exist_ok=True)
+    logger = setup_logging(os.path.join(args.output, "LOG.txt"))
+    started = datetime.now().isoformat(sep=' ', timespec='seconds')
+    logger.info(f"Scan started on {socket.gethostname()}: {', '.join(args.roots)}")
+    export_dir = None if args.no_copy else os.path.join(args.output, "exported_keys")
+    scanner = EncryptionScanner(args.roots, export_dir, args.walkers, args.hashers, args.copiers,
+                                hash_files=not args.no_hash, entropy=args.entropy, min_size=args.min_size,
+                                one_file_system=args.one_file_system, quiet=args.quiet, logger=logger)
+    try:
+        findings = scanner.run()
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr)
+        return 130
+    write_findings_csv(findings, os.path.join(args.output, "findings.csv"))
+    report = os.path.join(args.output, f"ENCRYPTION_AUDIT_{socket.gethostname()}.txt")
+    write_report(scanner, report, started)
+    logger.info(f"Scan finished: {len(findings)} finding(s) in {scanner.elapsed:.2f} seconds")
+    print(f"Scanned {scanner.stats['files']} files in {scanner.stats['directories']} folders in "
+          f"{scanner.elapsed:.2f} seconds (walk {scanner.walk_seconds:.2f} s); {len(findings)} finding(s).")
+    print(f"Report: {report}")
+    if scanner.stats['errors']:
+        print(f"{scanner.stats['errors']} file(s) or folder(s) could not be read; see LOG.txt.", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
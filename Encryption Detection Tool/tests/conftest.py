@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scanner is a single script next to this folder rather than an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
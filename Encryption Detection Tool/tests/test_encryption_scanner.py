@@ -0,0 +1,115 @@
+import os
+import errno
+import random
+import logging
+
+import pytest
+
+import encryption_scanner
+from encryption_scanner import (EncryptionScanner, ENTROPY_THRESHOLD, MIN_VOLUME_SIZE, copy_file, export_labels,
+                                sample_entropy)
+
+logging.getLogger("EncryptionScanLogger").addHandler(logging.NullHandler())
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def test_roots_with_the_same_name_export_to_separate_folders(tmp_path):
+    # /a/case and /b/case both hold keys/BitLocker Recovery Key.txt with different content
+    roots = [str(tmp_path / "a" / "case"), str(tmp_path / "b" / "case")]
+    for number, root in enumerate(roots):
+        _write(os.path.join(root, "keys", "BitLocker Recovery Key.txt"), f"key {number}".encode())
+        _write(os.path.join(root, "vault.hc"), os.urandom(4096))
+    export_dir = str(tmp_path / "out" / "exported_keys")
+    scanner = EncryptionScanner(roots, export_dir, quiet=True)
+    findings = scanner.run()
+    assert len(findings) == 4
+    copies = {finding['copied_to'] for finding in findings}
+    assert len(copies) == 4 and len({os.path.dirname(os.path.relpath(copy, export_dir)).split(os.sep)[0]
+                                     for copy in copies}) == 2
+    for finding in findings:
+        with open(finding['path'], 'rb') as source, open(finding['copied_to'], 'rb') as copy:
+            assert source.read() == copy.read()
+
+
+def test_export_labels():
+    labels = export_labels(["/mnt/img1", "/a/case", "/b/Case", "/"])
+    assert labels["/mnt/img1"] == "img1" and labels["/"] == "root"
+    # Names that differ only in case would still collide on a FAT or NTFS export drive
+    assert labels["/a/case"].lower() != labels["/b/Case"].lower() and labels["/a/case"].startswith("case_")
+
+
+def test_repeated_root_is_scanned_once(tmp_path):
+    _write(str(tmp_path / "data" / "veracrypt.xml"), b"<x/>")
+    scanner = EncryptionScanner([str(tmp_path / "data"), str(tmp_path / "data") + os.sep], quiet=True)
+    assert len(scanner.run()) == 1
+
+
+def _random_bytes(seed, size):
+    # random.randbytes needs Python 3.9
+    return random.Random(seed).getrandbits(size * 8).to_bytes(size, "little")
+
+
+def test_sample_entropy(tmp_path):
+    random_volume = tmp_path / "volume.bin"
+    _write(str(random_volume), _random_bytes(1, MIN_VOLUME_SIZE))
+    assert sample_entropy(str(random_volume), MIN_VOLUME_SIZE) >= ENTROPY_THRESHOLD
+    # Random except for a zeroed middle block: the lowest sample counts
+    zeroed = bytearray(_random_bytes(2, MIN_VOLUME_SIZE))
+    zeroed[MIN_VOLUME_SIZE // 2:MIN_VOLUME_SIZE // 2 + 4096] = bytes(4096)
+    _write(str(tmp_path / "zeroed.bin"), bytes(zeroed))
+    assert sample_entropy(str(tmp_path / "zeroed.bin"), MIN_VOLUME_SIZE) == 0.0
+    text = (b"The quick brown fox jumps over the lazy dog. " * 8000)[:MIN_VOLUME_SIZE]
+    _write(str(tmp_path / "text.bin"), text)
+    assert sample_entropy(str(tmp_path / "text.bin"), MIN_VOLUME_SIZE) < 5
+    # Known formats are not sampled at all, however random the rest looks
+    _write(str(tmp_path / "archive.bin"), b"PK\x03\x04" + _random_bytes(3, MIN_VOLUME_SIZE - 4))
+    assert sample_entropy(str(tmp_path / "archive.bin"), MIN_VOLUME_SIZE) is None
+
+
+def _unsupported(*args):
+    raise OSError(errno.ENOSYS, "not supported here")
+
+
+def _stops_after_one_chunk(step):
+    calls = []
+
+    def limited(src_fd, dst_fd, offset, count):
+        calls.append(offset)
+        return step(src_fd, dst_fd, offset, count) if len(calls) == 1 else 0
+    return limited
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    # Several chunks, so partial kernel copies can be forced
+    monkeypatch.setattr(encryption_scanner, "COPY_CHUNK_SIZE", 4096)
+    path = tmp_path / "container.hc"
+    _write(str(path), _random_bytes(4, 5 * 4096 + 123))
+    return path
+
+
+@pytest.mark.parametrize("range_step, sendfile_step, method", [
+    (None, _unsupported, "copy_file_range"),
+    (_unsupported, None, "sendfile"),
+    (_unsupported, _unsupported, "copy"),
+    ("partial", _unsupported, "copy_file_range+copy"),
+    (_unsupported, "partial", "sendfile+copy"),
+])
+def test_copy_file_fallbacks(source, tmp_path, monkeypatch, range_step, sendfile_step, method):
+    for name, step in (("copy_file_range", range_step), ("sendfile", sendfile_step)):
+        if step is not _unsupported and not hasattr(os, name):
+            pytest.skip(f"os.{name} is not available")
+    for attribute, step in (("_copy_range_step", range_step), ("_sendfile_step", sendfile_step)):
+        if step == "partial":
+            step = _stops_after_one_chunk(getattr(encryption_scanner, attribute))
+        if step is not None:
+            monkeypatch.setattr(encryption_scanner, attribute, step)
+    destination = tmp_path / "copy.hc"
+    assert copy_file(str(source), str(destination)) == method
+    assert destination.read_bytes() == source.read_bytes()
+    assert os.stat(destination).st_mtime_ns == os.stat(source).st_mtime_ns
@@ -0,0 +1,456 @@
+import io
+import os
+import sys
+import json
+import time
+import logging
+import random
+import shutil
+import zipfile
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime, timedelta
+
+import fitz
+
+from cybertip_core import (CyberTipParser, SectionStream, collect_files, map_file, hash_buffer, parse_file,
+                           scan_section, write_txt_exports)
+from cybertip_store import IndicatorStore
+from cybertip_export import export_occurrences
+
+BENCH_FORMAT_VERSION = 1
+DEFAULT_RESULTS_FILE = "cybertip_bench_results.json"
+# A stage counts as regressed when it is this much slower (or uses this much more memory) than the baseline
+DEFAULT_TOLERANCE = 0.20
+LINES_PER_PAGE = 70
+# Start-up budgets in milliseconds. Imports are timed inside a fresh interpreter, without the
+# interpreter's own start-up; worker_spawn runs from creating a "spawn" process pool to its first
+# answer, so it covers starting a Python process and importing cybertip_core in it.
+STARTUP_BUDGETS_MS = {'import_core': 75, 'import_cli': 150, 'worker_spawn': 400}
+# Modules the library core and the command line must not load just by being imported
+HEAVY_MODULES = ("fitz", "pymupdf", "tkinter", "tkinterdnd2")
+PLATFORMS = ["Facebook", "Instagram", "Snapchat", "Discord", "Kik", "Google", "Dropbox", "TikTok"]
+COMPANIES = ["Meta Platforms, Inc.", "Snap Inc.", "Discord Inc.", "Google LLC", "Dropbox, Inc.", "TikTok Inc."]
+EVENTS = ["Login", "Upload", "Registration", "Logout", "Password Change"]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+def _timestamp(rng):
+    moment = datetime(2023, 1, 1) + timedelta(seconds=rng.randrange(3 * 365 * 86400))
+    return moment.strftime("%m-%d-%Y %H:%M:%S UTC")
+
+
+def _ip(rng):
+    return f"{rng.choice([23, 45, 66, 73, 98, 104, 172, 192, 203])}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+
+
+def _phone(rng):
+    return f"({rng.randrange(201, 990)}) {rng.randrange(200, 999)}-{rng.randrange(10000):04d}"
+
+
+def tip_lines(rng, number, ip_rows=12, files=4, d_lines=200):
+    # The text of one report, section by section, shaped like a real CyberTipline PDF
+    user = f"user{rng.randrange(10 ** 6)}"
+    lines = [f"CyberTipline Report {number}", "Section A: Reporting Electronic Service Provider (ESP) Information",
+             "Submitter:", rng.choice(COMPANIES), rng.choice(PLATFORMS),
+             "Point of Contact for Law Enforcement:", "Legal Process Team", "Email: lawenf@ncmec.org",
+             f"Phone: {_phone(rng)}", "Incident Information", "Incident Type: Child Pornography (possession, "
+             "manufacture, and distribution)", f"Incident Time: {_timestamp(rng)}", "Suspect",
+             f"Email Address: {user}@{rng.choice(['gmail.com', 'yahoo.com', 'outlook.com', 'proton.me'])}",
+             f"Email Address: {user}.alt{rng.randrange(100)}@example.net (Verified)",
+             f"Phone: {_phone(rng)}", f"Screen/User Name: {user}", f"Display Name: {user.title()}_{rng.randrange(99)}",
+             f"ESP User ID: {rng.randrange(10 ** 9, 10 ** 10)}", "IP Address Type Date/Time"]
+    for _ in range(ip_rows):
+        lines += [f"IP Address: {_ip(rng)}", rng.choice(EVENTS), _timestamp(rng)]
+    lines.append("Uploaded File Information")
+    for index in range(files):
+        lines += [f"Filename: {rng.getrandbits(64):016x}_{index}.jpg", f"MD5: {rng.getrandbits(128):032x}",
+                  "Did Reporting ESP view entire contents of uploaded file? Yes",
+                  f"Original URL: https://cdn.example.com/{rng.getrandbits(48):012x}"]
+    lines += ["Section B: Automated Information Added by NCMEC Systems", "Geo-Lookup (Uploaded Files)"]
+    for _ in range(max(1, ip_rows // 3)):
+        lines += [f"IP Address: {_ip(rng)} Country: United States Region: TX City: Austin",
+                  f"Lookup Date {_timestamp(rng)}"]
+    lines += ["Section C: Additional Information Provided by NCMEC",
+              f"NCMEC analyst note: related account {user}_backup@gmail.com",
+              f"Possible phone association {_phone(rng)}",
+              "Section D: Law Enforcement Contact Information",
+              "National Center for Missing & Exploited Children", "Email: cybertipline@ncmec.org",
+              "Investigator: detective@police.gov Phone: (217) 782-9030"]
+    lines += [f"Case log entry {k}: IP Address: 10.9.8.{k % 250} {_timestamp(rng)} reviewed by {k}@agency.gov"
+              for k in range(d_lines)]
+    return lines
+
+
+def make_tip_pdf(rng, number, ip_rows=12, files=4, d_lines=200, toc=True):
+    lines = tip_lines(rng, number, ip_rows, files, d_lines)
+    doc = fitz.open()
+    toc_entries = []
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page_lines = lines[start:start + LINES_PER_PAGE]
+        page = doc.new_page()
+        page.insert_text((36, 36), "\n".join(page_lines), fontsize=7)
+        for line in page_lines:
+            if line.startswith("Section ") and line[8:9] in "ABCD" and line[9:10] == ":":
+                toc_entries.append([1, line, doc.page_count])
+    if toc:
+        doc.set_toc(toc_entries)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def generate_corpus(directory, tips=200, zip_every=10, ip_rows=12, files=4, d_lines=200, seed=1):
+    # Writes tips as loose PDFs plus, every zip_every tips, a ZIP bundle (with one nested ZIP)
+    # holding the next few; half the PDFs carry an outline so both Section D paths are used
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    number = 0
+    bundle = 0
+    while number < tips:
+        if zip_every and number % zip_every == zip_every - 1 and tips - number >= 3:
+            path = os.path.join(directory, f"bundle_{bundle:04d}.zip")
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr(f"reports/tip_{number:06d}.pdf", make_tip_pdf(rng, number, ip_rows, files, d_lines))
+                zf.writestr("media/upload_0001.jpg", os.urandom(4096))
+                nested = _nested_zip(make_tip_pdf(rng, number + 1, ip_rows, files, d_lines, toc=False),
+                                     f"tip_{number + 1:06d}.pdf")
+                zf.writestr(f"reports/nested_{bundle:04d}.zip", nested)
+                zf.writestr(f"tip_{number + 2:06d}.pdf", make_tip_pdf(rng, number + 2, ip_rows, files, d_lines))
+            number += 3
+            bundle += 1
+        else:
+            with open(os.path.join(directory, f"tip_{number:06d}.pdf"), 'wb') as f:
+                f.write(make_tip_pdf(rng, number, ip_rows, files, d_lines, toc=number % 2 == 0))
+            number += 1
+    return collect_files([directory])
+
+
+def _nested_zip(pdf_bytes, name):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(name, pdf_bytes)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+class _CollectingParser(CyberTipParser):
+    # Splits pages into sections like the real parser but keeps the section text instead of scanning it
+    def __init__(self):
+        super().__init__(selective=True)
+        self.sections = []
+
+    def parse_section(self, section_text, section="", page_offsets=None):
+        self.sections.append(section_text)
+
+
+def _pdf_streams(files):
+    # Every PDF in the corpus as bytes, including those inside (nested) ZIPs
+    parser = CyberTipParser()
+    for path in files:
+        if path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as zf:
+                for _, pdf_bytes in parser.iter_zip_pdfs(zf):
+                    yield pdf_bytes
+        else:
+            with open(path, 'rb') as f:
+                yield f.read()
+
+
+def stage_hashing(context):
+    total = 0
+    for path in context['files']:
+        with map_file(path) as buffer:
+            hash_buffer(buffer)
+            total += len(buffer)
+    return len(context['files']), "files", total
+
+
+def stage_text_extraction(context):
+    pages = []
+    total = 0
+    for pdf_bytes in context['pdfs']:
+        total += len(pdf_bytes)
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        try:
+            pages.append([page.get_text("text") for page in doc])
+        finally:
+            doc.close()
+    context['pages'] = pages
+    return sum(len(doc_pages) for doc_pages in pages), "pages", total
+
+
+def stage_section_splitting(context):
+    sections = []
+    pages = 0
+    total = 0
+    for doc_pages in context['pages']:
+        parser = _CollectingParser()
+        stream = SectionStream(parser)
+        for page_text in doc_pages:
+            stream.feed_page(page_text)
+            pages += 1
+            total += len(page_text)
+            if stream.in_section_d():
+                break
+        stream.close()
+        sections.extend(parser.sections)
+    context['sections'] = sections
+    return pages, "pages", total
+
+
+def stage_parse_section(context):
+    matches = 0
+    for section_text in context['sections']:
+        for values in scan_section(section_text).values():
+            matches += len(values)
+    context['matches'] = matches
+    return len(context['sections']), "sections", sum(len(text) for text in context['sections'])
+
+
+def stage_end_to_end(context):
+    results = [parse_file(path) for path in context['files']]
+    failed = [result.path for result in results if result.error]
+    if failed:
+        raise RuntimeError(f"Could not parse {len(failed)} corpus file(s), e.g. {failed[0]}")
+    context['results'] = results
+    return len(results), "files", sum(os.path.getsize(path) for path in context['files'])
+
+
+def stage_merging(context):
+    store = IndicatorStore()
+    for result in context['results']:
+        store.add_result(result)
+    context['store'] = store
+    return store.occurrence_count(), "occurrences", None
+
+
+def _export_stage(fmt):
+    def stage(context):
+        filename = os.path.join(context['workdir'], f"occurrences.{fmt}")
+        rows = export_occurrences(context['store'], filename)
+        return rows, "rows", os.path.getsize(filename)
+    return stage
+
+
+def stage_export_txt(context):
+    directory = os.path.join(context['workdir'], "txt")
+    os.makedirs(directory, exist_ok=True)
+    data = context['store'].to_data()
+    write_txt_exports(data, directory)
+    return sum(len(values) for values in data.values()), "values", None
+
+
+STAGES = [
+    ("hashing", stage_hashing),
+    ("text_extraction", stage_text_extraction),
+    ("section_splitting", stage_section_splitting),
+    ("parse_section", stage_parse_section),
+    ("end_to_end", stage_end_to_end),
+    ("merging", stage_merging),
+    ("export_txt", stage_export_txt),
+    ("export_csv", _export_stage("csv")),
+    ("export_jsonl", _export_stage("jsonl")),
+    ("export_sqlite", _export_stage("sqlite3")),
+]
+
+
+def run_stages(files, workdir, repeat=3, measure_memory=True):
+    # Each stage is timed repeat times (best run kept) and then run once more under tracemalloc,
+    # which slows Python down, for its peak memory. Stages feed their output to the next one.
+    context = {'files': files, 'workdir': workdir, 'pdfs': list(_pdf_streams(files))}
+    report = {}
+    for name, stage in STAGES:
+        best = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            items, unit, size = stage(context)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        entry = {'seconds': round(best, 6), 'items': items, 'unit': unit,
+                 'items_per_s': round(items / best, 2) if best else None}
+        if size is not None:
+            entry['bytes'] = size
+            entry['mb_per_s'] = round(size / 1024 / 1024 / best, 3) if best else None
+        if measure_memory:
+            tracemalloc.start()
+            stage(context)
+            entry['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 3)
+            tracemalloc.stop()
+        report[name] = entry
+        print(f"  {name:<18} {entry['items']:>9} {unit:<11} {best:>9.3f} s  "
+              f"{entry['items_per_s'] or 0:>12.1f} {unit}/s"
+              + (f"  {entry['peak_mb']:>8.1f} MB peak" if measure_memory else ""), file=sys.stderr)
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Start-up
+# ---------------------------------------------------------------------------
+
+_IMPORT_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"ms": (time.perf_counter() - start) * 1000,
+                  "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+_SPAWN_PROBE = """
+import json, time, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import cybertip_core
+start = time.perf_counter()
+with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+    executor.submit(cybertip_core.hash_buffer, b"").result()
+    print(json.dumps({"ms": (time.perf_counter() - start) * 1000, "loaded": []}))
+"""
+
+
+def _probe(code, workdir):
+    # Runs code in a fresh interpreter that can import the extractor's modules
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_startup(workdir, repeat=3):
+    probes = {
+        'import_core': _IMPORT_PROBE.format(module="cybertip_core", heavy=HEAVY_MODULES),
+        'import_cli': _IMPORT_PROBE.format(module="cybertip_cli", heavy=HEAVY_MODULES),
+        'worker_spawn': _SPAWN_PROBE,
+    }
+    report = {}
+    for name, code in probes.items():
+        best = min((_probe(code, workdir) for _ in range(max(1, repeat))), key=lambda run: run['ms'])
+        report[name] = {'ms': round(best['ms'], 3), 'budget_ms': STARTUP_BUDGETS_MS[name],
+                        'heavy_modules': best['loaded']}
+        print(f"  {name:<18} {best['ms']:>9.1f} ms  (budget {STARTUP_BUDGETS_MS[name]} ms)"
+              + (f"  loads {', '.join(best['loaded'])}" if best['loaded'] else ""), file=sys.stderr)
+    return report
+
+
+def startup_problems(startup):
+    problems = []
+    for name, entry in startup.items():
+        if entry['ms'] > entry['budget_ms']:
+            problems.append(f"{name}: {entry['ms']:.1f} ms is over the {entry['budget_ms']} ms budget")
+        if entry['heavy_modules']:
+            problems.append(f"{name}: imports {', '.join(entry['heavy_modules'])}")
+    return problems
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pymupdf': fitz.version[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    # Lines describing every stage that got slower or hungrier than the baseline allows
+    regressions = []
+    for name, entry in report['stages'].items():
+        old = baseline.get('stages', {}).get(name)
+        if not old:
+            continue
+        if old.get('items_per_s') and entry.get('items_per_s'):
+            ratio = entry['items_per_s'] / old['items_per_s']
+            if ratio < 1 - tolerance:
+                regressions.append(f"{name}: throughput {entry['items_per_s']:.1f} vs {old['items_per_s']:.1f} "
+                                   f"{entry['unit']}/s ({(1 - ratio) * 100:.0f}% slower)")
+        if old.get('peak_mb') and entry.get('peak_mb') and entry['peak_mb'] > old['peak_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {entry['peak_mb']:.1f} MB vs {old['peak_mb']:.1f} MB")
+    if report['corpus'] != baseline.get('corpus'):
+        regressions.insert(0, "note: the corpus settings differ from the baseline; numbers are not comparable")
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cybertip_bench", description="Benchmark the extractor stage by stage on a synthetic CyberTip corpus.")
+    parser.add_argument("--tips", type=int, default=200, help="Number of synthetic reports (default: %(default)s).")
+    parser.add_argument("--ip-rows", type=int, default=12, help="IP table rows per report (default: %(default)s).")
+    parser.add_argument("--files", type=int, default=4, help="Uploaded files (hashes) per report (default: %(default)s).")
+    parser.add_argument("--d-lines", type=int, default=200,
+                        help="Lines of Section D text per report, which selective parsing skips (default: %(default)s).")
+    parser.add_argument("--zip-every", type=int, default=10,
+                        help="Put every Nth group of reports into a ZIP bundle; 0 for none (default: %(default)s).")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the corpus (default: %(default)s).")
+    parser.add_argument("--corpus", help="Keep the generated corpus in this folder (reused if it already exists).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the best is kept (default: %(default)s).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run of each stage.")
+    parser.add_argument("--no-startup", action="store_true", help="Skip the import and worker start-up checks.")
+    parser.add_argument("-o", "--output", default=DEFAULT_RESULTS_FILE, help="Results file (default: %(default)s).")
+    parser.add_argument("--baseline", help="Compare against this earlier results file and exit 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown or memory growth against the baseline (default: %(default)s).")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # The corpus deliberately contains things the parser warns about (e.g. images inside ZIPs)
+    logging.getLogger("CyberTipLogger").addHandler(logging.NullHandler())
+    corpus_settings = {'tips': args.tips, 'ip_rows': args.ip_rows, 'files': args.files, 'd_lines': args.d_lines,
+                       'zip_every': args.zip_every, 'seed': args.seed}
+    workdir = tempfile.mkdtemp(prefix="cybertip_bench_")
+    try:
+        corpus = args.corpus or os.path.join(workdir, "corpus")
+        start = time.perf_counter()
+        if args.corpus and os.path.isdir(corpus) and os.listdir(corpus):
+            files = collect_files([corpus])
+        else:
+            files = generate_corpus(corpus, args.tips, args.zip_every, args.ip_rows, args.files, args.d_lines,
+                                    args.seed)
+        print(f"Corpus: {len(files)} file(s) in {corpus} ({time.perf_counter() - start:.1f} s to prepare)",
+              file=sys.stderr)
+        stages = run_stages(files, workdir, args.repeat, not args.no_memory)
+        startup = {} if args.no_startup else measure_startup(workdir, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report = {
+        'format': BENCH_FORMAT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'corpus': corpus_settings,
+        'stages': stages,
+        'startup': startup,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    problems = startup_problems(startup)
+    for line in problems:
+        print(f"STARTUP {line}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}" if not line.startswith("note:") else line)
+        if any(not line.startswith("note:") for line in regressions):
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
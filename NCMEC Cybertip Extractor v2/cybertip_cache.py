@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+
+CACHE_FILE_NAME = "cybertip_cache.sqlite3"
+DEFAULT_MAX_MB = 512
+
+# One connection per (cache file, process); connections must not cross a fork
+_open_caches = {}
+
+
+def default_cache_path():
+    return os.path.join(os.getcwd(), CACHE_FILE_NAME)
+
+
+def get_cache(path, max_mb=DEFAULT_MAX_MB):
+    key = (os.path.abspath(path), os.getpid())
+    cache = _open_caches.get(key)
+    if cache is None:
+        cache = _open_caches[key] = ResultCache(path, max_mb=max_mb)
+    return cache
+
+
+class ResultCache:
+    # Maps the hash of a PDF's content plus the parser fingerprint to the indicators extracted
+    # from it, so a tip that was seen before (renamed, re-dropped or inside another ZIP) is
+    # never parsed twice. Entries from other parser fingerprints are ignored and can be pruned.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            content_hash TEXT NOT NULL,
+            parser_version TEXT NOT NULL,
+            data TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (content_hash, parser_version)
+        );
+        CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+    """
+
+    def __init__(self, path=None, max_mb=DEFAULT_MAX_MB, logger=None):
+        self.path = path or default_cache_path()
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.logger = logger or logging.getLogger("CyberTipLogger")
+        # Pool workers read and write concurrently; WAL lets readers proceed during writes
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def get(self, content_hash, parser_version):
+        row = self.conn.execute(
+            "SELECT data FROM results WHERE content_hash = ? AND parser_version = ?",
+            (content_hash, parser_version)).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE results SET last_used = ? WHERE content_hash = ? AND parser_version = ?",
+                (time.time(), content_hash, parser_version))
+        payload = json.loads(row[0])
+        data = {key: set(values) for key, values in payload['data'].items()}
+        return data, [tuple(occurrence) for occurrence in payload['occurrences']]
+
+    def put(self, content_hash, parser_version, data, occurrences):
+        # Empty fields are kept so a cached result produces the same export files as a fresh parse
+        payload = json.dumps({
+            'data': {key: sorted(values) for key, values in data.items()},
+            'occurrences': sorted(occurrences),
+        })
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (content_hash, parser_version, payload, len(payload), now, now))
+
+    def evict(self):
+        # Drops least recently used entries until the cache fits in max_bytes
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        rows = self.conn.execute(
+            "SELECT content_hash, parser_version, size FROM results ORDER BY last_used").fetchall()
+        with self.conn:
+            for content_hash, parser_version, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM results WHERE content_hash = ? AND parser_version = ?",
+                                  (content_hash, parser_version))
+                total -= size
+                removed += 1
+        self.logger.info(f"Cache eviction removed {removed} entries from {self.path}")
+        return removed
+
+    def prune(self, current_versions):
+        # Removes entries written by parser versions other than the current ones
+        placeholders = ", ".join("?" for _ in current_versions)
+        with self.conn:
+            cursor = self.conn.execute(
+                f"DELETE FROM results WHERE parser_version NOT IN ({placeholders})", tuple(current_versions))
+        self.logger.info(f"Cache prune removed {cursor.rowcount} stale entries from {self.path}")
+        return cursor.rowcount
+
+    def clear(self):
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM results")
+        self.conn.execute("VACUUM")
+        self.logger.info(f"Cache cleared: {self.path}")
+        return cursor.rowcount
+
+    def total_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def summary(self):
+        rows = self.conn.execute(
+            "SELECT parser_version, COUNT(*), COALESCE(SUM(size), 0) FROM results GROUP BY parser_version").fetchall()
+        return {version: {'entries': count, 'bytes': size} for version, count, size in rows}
+
+    def close(self):
+        self.conn.close()
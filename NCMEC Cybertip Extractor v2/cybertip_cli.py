@@ -0,0 +1,464 @@
+import os
+import sys
+import time
+import calendar
+import signal
+import argparse
+import ipaddress
+from datetime import datetime
+from concurrent.futures import BrokenExecutor
+
+from cybertip_core import (setup_logging, collect_files, write_txt_exports,
+                           write_hash_manifest, parser_fingerprint, CyberTipParser, scan_section)
+from cybertip_reference import reference_scan_section
+from cybertip_cache import ResultCache, default_cache_path, DEFAULT_MAX_MB
+from cybertip_store import IndicatorStore, write_ip_timeline
+from cybertip_export import export_occurrences, EXPORT_FORMATS, EXPORT_EXTENSIONS, DEFAULT_SORT_MEMORY_MB
+from cybertip_metrics import Metrics, METRICS_FILE_NAME, LOG_LEVELS, set_log_level
+from cybertip_watch import WatchService, DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_SECONDS
+from cybertip_pipeline import (IngestPipeline, DEFAULT_READERS, DEFAULT_READ_AHEAD, DEFAULT_BUFFER_MB,
+                               DEFAULT_RESULT_DEPTH)
+
+
+def ingest(files, store, workers, quiet=False, selective=True, cache_path=None, cache_max_mb=DEFAULT_MAX_MB,
+           metrics=None, pipeline_options=None):
+    # Parses files into the store; returns the successful results, the errors and the page/cache totals.
+    # Worker metrics are merged into metrics when it is enabled. pipeline_options are passed on to
+    # IngestPipeline (readers, read_ahead, buffer_mb, parse_depth, result_depth).
+    metrics = metrics or Metrics(enabled=False)
+    errors = []
+    hashed = []
+    totals = {'pages': 0, 'pages_skipped': 0, 'cache_hits': 0, 'cache_misses': 0}
+    pipeline = IngestPipeline(files, workers, selective=selective, cache_path=cache_path, metrics=metrics.enabled,
+                              **(pipeline_options or {}))
+    processed = 0
+    try:
+        for result in pipeline:
+            processed += 1
+            for key in totals:
+                totals[key] += result.stats.get(key, 0)
+            metrics.merge(result.metrics)
+            if result.error:
+                errors.append(f"{os.path.basename(result.path)}: {result.error}")
+                metrics.count('files_failed')
+            else:
+                with metrics.timer('merge'):
+                    store.add_result(result)
+                metrics.count('files_merged')
+                hashed.append(result)
+            if not quiet:
+                status = "ERROR" if result.error else result.md5
+                print(f"[{processed}/{len(files)}] {result.path}  |  {status}", file=sys.stderr)
+    except BrokenExecutor as e:
+        # A worker process died (crash or out of memory); keep what was parsed and report the rest
+        store.logger.error(f"Ingestion stopped after {processed} of {len(files)} file(s): {e}")
+        errors.append(f"Stopped after {processed} of {len(files)} file(s), a worker process died: {e}")
+    metrics.add_time('read', pipeline.stats['read_s'])
+    metrics.add_time('reader_wait', pipeline.stats['reader_wait_s'])
+    metrics.add_time('parser_wait', pipeline.stats['parser_wait_s'])
+    metrics.count('bytes_read_ahead', pipeline.stats['read_bytes'])
+    if cache_path:
+        cache = ResultCache(cache_path, max_mb=cache_max_mb, logger=store.logger)
+        cache.evict()
+        cache.close()
+    return hashed, errors, totals
+
+
+def run_batch(paths, output_dir, workers=None, recursive=True, quiet=False, selective=True,
+              cache_path=None, cache_max_mb=DEFAULT_MAX_MB, formats=(), sort_memory_mb=DEFAULT_SORT_MEMORY_MB,
+              collect_metrics=True, pipeline_options=None):
+    logger = setup_logging()
+    workers = workers or os.cpu_count() or 1
+    files = collect_files(paths, recursive=recursive)
+    if not files:
+        print("No PDF or ZIP files found.", file=sys.stderr)
+        return 1
+    start_all = time.time()
+    logger.info(f"Batch started: {len(files)} file(s) with {workers} worker(s)")
+    store = IndicatorStore(logger)
+    metrics = Metrics(enabled=collect_metrics)
+    with metrics.timer('ingest'):
+        hashed, errors, totals = ingest(files, store, workers, quiet, selective, cache_path, cache_max_mb, metrics,
+                                        pipeline_options)
+    pages, pages_skipped = totals['pages'], totals['pages_skipped']
+    os.makedirs(output_dir, exist_ok=True)
+    with metrics.timer('export_txt'):
+        write_txt_exports(store.to_data(), output_dir, logger)
+    with metrics.timer('export_hashes'):
+        write_hash_manifest(hashed, os.path.join(output_dir, "file_hashes.csv"))
+    with metrics.timer('export_timeline'):
+        write_ip_timeline(store, os.path.join(output_dir, "ip_timeline.csv"))
+    for fmt in formats:
+        with metrics.timer(f"export_{fmt}"):
+            export_occurrences(store, os.path.join(output_dir, "occurrences" + EXPORT_EXTENSIONS[fmt]), fmt,
+                               memory_mb=sort_memory_mb, logger=logger)
+    total_elapsed = time.time() - start_all
+    if metrics:
+        metrics.write(os.path.join(output_dir, METRICS_FILE_NAME), total_elapsed, logger,
+                      command="batch", workers=workers, tips=len(store.tip_hashes),
+                      occurrences=store.occurrence_count())
+    logger.info(f"Batch finished: {len(files)} file(s) in {total_elapsed:.2f} seconds")
+    for key in store.value_text:
+        logger.info(f"SUMMARY: {key}: {store.count(key)} total items.")
+    logger.info(f"SUMMARY: {store.occurrence_count()} occurrences in {len(store.tip_hashes)} tip(s).")
+    print(f"Processed {len(files)} file(s) in {total_elapsed:.2f} seconds; results written to {output_dir}")
+    if cache_path:
+        logger.info(f"Result cache: {totals['cache_hits']} hit(s), {totals['cache_misses']} miss(es)")
+        print(f"Loaded {totals['cache_hits']} PDF(s) from the result cache; parsed {totals['cache_misses']}")
+    # PDFs loaded from the cache have no pages read, so the page line only covers the parsed ones
+    if pages:
+        logger.info(f"Pages skipped after Section D: {pages_skipped} of {pages}")
+        print(f"Read {pages - pages_skipped} of {pages} page(s); skipped {pages_skipped} after Section D")
+    if errors:
+        print("Some files could not be processed:\n" + "\n".join(errors), file=sys.stderr)
+        return 1
+    return 0
+
+
+def print_tips(tips, indent="    "):
+    for tip_hash, name in tips:
+        print(f"{indent}{name}  |  SHA-256: {tip_hash}")
+
+
+def run_correlate(paths, workers=None, recursive=True, quiet=False, cache_path=None, cache_max_mb=DEFAULT_MAX_MB,
+                  indicators=(), top=20, show_clusters=False, fields=None, min_tips=2, max_tips=None,
+                  metrics_path=None, pipeline_options=None):
+    logger = setup_logging()
+    workers = workers or os.cpu_count() or 1
+    files = collect_files(paths, recursive=recursive)
+    if not files:
+        print("No PDF or ZIP files found.", file=sys.stderr)
+        return 1
+    store = IndicatorStore(logger)
+    start_all = time.time()
+    metrics = Metrics(enabled=bool(metrics_path))
+    with metrics.timer('ingest'):
+        _, errors, _ = ingest(files, store, workers, quiet, cache_path=cache_path, cache_max_mb=cache_max_mb,
+                              metrics=metrics, pipeline_options=pipeline_options)
+    start = time.time()
+    print(f"Indexed {len(store.tip_hashes)} tip(s) from {len(files)} file(s)")
+    for value in indicators:
+        matches = store.find_indicator(value)
+        if not matches:
+            print(f"\n{value}: not found in any tip")
+        for field in matches:
+            tips = store.tips_containing(field, value)
+            print(f"\n{value} ({field}) is in {len(tips)} tip(s):")
+            print_tips(tips)
+    if top and not indicators:
+        shared = store.shared_indicators(fields, min_tips, top)
+        print(f"\nTop {len(shared)} indicator(s) shared by at least {min_tips} tips:")
+        for field, value, count in shared:
+            print(f"    {count:>6}  {field:<10} {value}")
+    if show_clusters:
+        clusters = store.clusters(fields, max_tips=max_tips)
+        print(f"\n{len(clusters)} cluster(s) of tips linked by shared indicators:")
+        for number, tips in enumerate(clusters, 1):
+            print(f"  Cluster {number} ({len(tips)} tips):")
+            print_tips(tips)
+    logger.info(f"Correlation queries answered in {time.time() - start:.3f} seconds")
+    if metrics:
+        metrics.add_time('queries', time.time() - start)
+        metrics.write(metrics_path, time.time() - start_all, logger, command="correlate", workers=workers)
+    if errors:
+        print("Some files could not be processed:\n" + "\n".join(errors), file=sys.stderr)
+        return 1
+    return 0
+
+
+def parse_time_bound(text, end=False):
+    # "2024-01-31" or "2024-01-31 18:00:00" (UTC) -> epoch seconds; a bare end date covers the whole day
+    moment = datetime.fromisoformat(text)
+    epoch = calendar.timegm(moment.timetuple())
+    if end and len(text) <= 10:
+        epoch += 86399
+    return epoch
+
+
+def run_timeline(paths, output=None, start=None, end=None, networks=(), workers=None, recursive=True,
+                 quiet=False, cache_path=None, cache_max_mb=DEFAULT_MAX_MB, metrics_path=None, pipeline_options=None):
+    logger = setup_logging()
+    workers = workers or os.cpu_count() or 1
+    files = collect_files(paths, recursive=recursive)
+    if not files:
+        print("No PDF or ZIP files found.", file=sys.stderr)
+        return 1
+    store = IndicatorStore(logger)
+    start_all = time.time()
+    metrics = Metrics(enabled=bool(metrics_path))
+    with metrics.timer('ingest'):
+        _, errors, _ = ingest(files, store, workers, quiet, cache_path=cache_path, cache_max_mb=cache_max_mb,
+                              metrics=metrics, pipeline_options=pipeline_options)
+    query_start = time.time()
+    events = store.ip_events(start, end, networks)
+    logger.info(f"Timeline query matched {len(events)} of {len(store.timeline)} IP events "
+                f"in {time.time() - query_start:.3f} seconds")
+    if output:
+        write_ip_timeline(store, output, events)
+        print(f"Wrote {len(events)} of {len(store.timeline)} IP event(s) to {output}")
+    else:
+        for event_id in events:
+            timestamp, address, tip_hash, name, section, page = store.ip_event(event_id)
+            location = f"Section {section}, page {page}" if section else f"page {page}"
+            print(f"{timestamp}  {address:<15}  {os.path.basename(name)}  |  {location}  |  SHA-256: {tip_hash}")
+    if metrics:
+        metrics.add_time('queries', time.time() - query_start)
+        metrics.write(metrics_path, time.time() - start_all, logger, command="timeline", workers=workers)
+    if errors:
+        print("Some files could not be processed:\n" + "\n".join(errors), file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_watch(paths, output_dir, workers=None, recursive=True, quiet=False, selective=True, cache_path=None,
+              cache_max_mb=DEFAULT_MAX_MB, formats=(), interval=DEFAULT_POLL_INTERVAL,
+              settle=DEFAULT_SETTLE_SECONDS, use_inotify=True, once=False):
+    logger = setup_logging()
+    missing = [path for path in paths if not os.path.isdir(path)]
+    if missing:
+        print(f"Not a folder: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    service = WatchService(paths, output_dir, workers, recursive, selective, cache_path, cache_max_mb, formats,
+                           interval, settle, use_inotify, quiet, logger)
+    # A service manager stops the watcher with SIGTERM; finish the current batch and exit cleanly
+    signal.signal(signal.SIGTERM, lambda signum, frame: service.stop())
+    try:
+        service.run(once=once)
+    except KeyboardInterrupt:
+        service.stop()
+    print(f"Stopped. {len(service.store.tip_hashes)} tip(s) from {len(service.file_hashes)} file(s) "
+          f"in {output_dir}", file=sys.stderr)
+    return 0
+
+
+def run_cache_command(action, cache_path, cache_max_mb=DEFAULT_MAX_MB):
+    setup_logging()
+    if action != "stats" and not os.path.exists(cache_path):
+        print(f"No cache at {cache_path}")
+        return 0
+    cache = ResultCache(cache_path, max_mb=cache_max_mb)
+    try:
+        if action == "stats":
+            current = {parser_fingerprint(True), parser_fingerprint(False)}
+            summary = cache.summary()
+            print(f"Cache: {cache_path}")
+            for version, info in sorted(summary.items()):
+                state = "current" if version in current else "stale"
+                print(f"  {version} ({state}): {info['entries']} entries, {info['bytes'] / 1024 / 1024:.1f} MB")
+            if not summary:
+                print("  (empty)")
+        elif action == "prune":
+            removed = cache.prune([parser_fingerprint(True), parser_fingerprint(False)])
+            print(f"Removed {removed} entries created by other parser versions")
+        elif action == "evict":
+            print(f"Removed {cache.evict()} least recently used entries")
+        elif action == "clear":
+            print(f"Removed {cache.clear()} entries")
+    finally:
+        cache.close()
+    return 0
+
+
+class _SelfCheckParser(CyberTipParser):
+    # Runs the single-pass scanner and the original extractor side by side on every section
+    def __init__(self, logger):
+        super().__init__(logger, selective=False)
+        self.sections = 0
+        self.mismatches = []
+
+    def parse_section(self, section_text, section="", page_offsets=None):
+        self.sections += 1
+        new = {key: set(values) for key, values in scan_section(section_text).items() if values}
+        old = {key: values for key, values in reference_scan_section(section_text).items() if values}
+        if new != old:
+            for key in sorted(set(new) | set(old)):
+                missing = old.get(key, set()) - new.get(key, set())
+                extra = new.get(key, set()) - old.get(key, set())
+                if missing or extra:
+                    self.mismatches.append(f"{key}: missing {sorted(missing)}, extra {sorted(extra)}")
+        super().parse_section(section_text, section, page_offsets)
+
+
+def run_selfcheck(paths):
+    logger = setup_logging()
+    files = collect_files(paths)
+    if not files:
+        print("No PDF or ZIP files found.", file=sys.stderr)
+        return 1
+    sections = 0
+    failed = 0
+    for path in files:
+        parser = _SelfCheckParser(logger)
+        try:
+            parser.process_file(path)
+        except Exception as e:
+            print(f"{path}: could not be read: {e}", file=sys.stderr)
+            continue
+        sections += parser.sections
+        if parser.mismatches:
+            failed += 1
+            print(f"{path}: scanner output differs from the reference extractor")
+            for line in parser.mismatches:
+                print(f"    {line}")
+    print(f"Checked {sections} section(s) in {len(files)} file(s); {failed} file(s) differ")
+    return 1 if failed else 0
+
+
+def add_cache_arguments(parser):
+    parser.add_argument("--cache", default=default_cache_path(), help="Result cache database (default: %(default)s).")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_MAX_MB,
+                        help="Evict least recently used results above this size (default: %(default)s).")
+
+
+def add_pipeline_arguments(parser):
+    parser.add_argument("--readers", type=int, default=DEFAULT_READERS,
+                        help="Files read in parallel while others are parsed (default: %(default)s; raise it for "
+                             "slow network shares).")
+    parser.add_argument("--read-ahead", type=int, default=DEFAULT_READ_AHEAD,
+                        help="Files read ahead of the parsers (default: %(default)s).")
+    parser.add_argument("--read-buffer-mb", type=float, default=DEFAULT_BUFFER_MB,
+                        help="Memory the read-ahead files may use together (default: %(default)s).")
+    parser.add_argument("--parse-depth", type=int, default=None,
+                        help="Files handed to the workers at once (default: twice the number of workers).")
+    parser.add_argument("--result-depth", type=int, default=DEFAULT_RESULT_DEPTH,
+                        help="Parsed files waiting to be merged before the workers pause (default: %(default)s).")
+
+
+def pipeline_options(args):
+    return {'readers': args.readers, 'read_ahead': args.read_ahead, 'buffer_mb': args.read_buffer_mb,
+            'parse_depth': args.parse_depth, 'result_depth': args.result_depth}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cybertip_extractor", description="Headless CyberTip Extractor.")
+    parser.add_argument("--log-level", choices=LOG_LEVELS, type=str.upper,
+                        help="Detail written to cybertip_parser.log (default: INFO, or $CYBERTIP_LOG_LEVEL).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    batch = subparsers.add_parser("batch", help="Parse PDF/ZIP files or folders and export results to TXT.")
+    batch.add_argument("paths", nargs="+", help="PDF/ZIP files or folders containing them.")
+    batch.add_argument("-o", "--output", default="cybertip_export", help="Folder for the exported .txt files.")
+    batch.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    batch.add_argument("--no-recursive", action="store_true", help="Only scan the top level of input folders.")
+    batch.add_argument("-q", "--quiet", action="store_true", help="Do not print per-file progress.")
+    batch.add_argument("--all-pages", action="store_true",
+                       help="Read every page instead of stopping at Section D (slower).")
+    add_cache_arguments(batch)
+    add_pipeline_arguments(batch)
+    batch.add_argument("--no-cache", action="store_true", help="Parse every file even if it was seen before.")
+    batch.add_argument("-f", "--format", action="append", choices=EXPORT_FORMATS, default=[],
+                       help="Also write every occurrence with its tip, section and timestamp to "
+                            "occurrences.csv/.jsonl/.sqlite3 (repeatable).")
+    batch.add_argument("--sort-memory-mb", type=float, default=DEFAULT_SORT_MEMORY_MB,
+                       help="Sort the --format exports on disk above this much memory (default: %(default)s).")
+    batch.add_argument("--no-metrics", action="store_true",
+                       help=f"Do not time the stages or write {METRICS_FILE_NAME} to the output folder.")
+    watch = subparsers.add_parser("watch", help="Keep watching intake folders and ingest new tips as they arrive.")
+    watch.add_argument("paths", nargs="+", help="Folders to watch.")
+    watch.add_argument("-o", "--output", default="cybertip_export", help="Folder for the continuously updated exports.")
+    watch.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    watch.add_argument("--no-recursive", action="store_true", help="Only watch the top level of the folders.")
+    watch.add_argument("-q", "--quiet", action="store_true", help="Do not print a line per ingested file.")
+    watch.add_argument("--all-pages", action="store_true",
+                       help="Read every page instead of stopping at Section D (slower).")
+    add_cache_arguments(watch)
+    watch.add_argument("--no-cache", action="store_true",
+                       help="Do not use the result cache (a restart then parses every file again).")
+    watch.add_argument("-f", "--format", action="append", choices=EXPORT_FORMATS, default=[],
+                       help="Also append every new occurrence to occurrences.csv/.jsonl/.sqlite3 (repeatable).")
+    watch.add_argument("--poll", action="store_true",
+                       help="Rescan the folders on a timer instead of using inotify (e.g. for network shares).")
+    watch.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                       help="Seconds between rescans when polling (default: %(default)s).")
+    watch.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                       help="Seconds a file must stay unchanged before it is read (default: %(default)s).")
+    watch.add_argument("--once", action="store_true", help="Ingest what is in the folders now, then exit.")
+    cache = subparsers.add_parser("cache", help="Inspect or maintain the result cache.")
+    cache.add_argument("action", choices=["stats", "prune", "evict", "clear"],
+                       help="stats: show size; prune: drop results from older parser versions (run after "
+                            "changing the regexes); evict: enforce --cache-max-mb; clear: drop everything.")
+    add_cache_arguments(cache)
+    correlate = subparsers.add_parser("correlate", help="Find indicators and tips that are linked across reports.")
+    correlate.add_argument("paths", nargs="+", help="PDF/ZIP files or folders containing them.")
+    correlate.add_argument("-i", "--indicator", action="append", default=[],
+                           help="List the tips containing this email, IP address, username, phone or hash "
+                                "(repeatable).")
+    correlate.add_argument("--top", type=int, default=20,
+                           help="Show the indicators shared by the most tips (default: %(default)s; 0 to hide).")
+    correlate.add_argument("--clusters", action="store_true",
+                           help="Group tips that are connected through shared indicators.")
+    correlate.add_argument("--fields", nargs="+", choices=list(IndicatorStore.CORRELATION_FIELDS),
+                           help="Indicator types to correlate on (default: all of them).")
+    correlate.add_argument("--min-tips", type=int, default=2, help="Minimum tips for --top (default: %(default)s).")
+    correlate.add_argument("--max-tips", type=int, default=None,
+                           help="Ignore indicators found in more than this many tips when building clusters.")
+    correlate.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    correlate.add_argument("--no-recursive", action="store_true", help="Only scan the top level of input folders.")
+    correlate.add_argument("-q", "--quiet", action="store_true", help="Do not print per-file progress.")
+    add_cache_arguments(correlate)
+    add_pipeline_arguments(correlate)
+    correlate.add_argument("--no-cache", action="store_true", help="Parse every file even if it was seen before.")
+    correlate.add_argument("--metrics", help="Write stage timings and counters to this JSON file.")
+    timeline = subparsers.add_parser("timeline", help="List IP address events from all tips in time order.")
+    timeline.add_argument("paths", nargs="+", help="PDF/ZIP files or folders containing them.")
+    timeline.add_argument("-o", "--output", help="Write the events to this CSV file instead of printing them.")
+    timeline.add_argument("--start", help="Only events at or after this UTC time (YYYY-MM-DD[ HH:MM:SS]).")
+    timeline.add_argument("--end", help="Only events at or before this UTC time (YYYY-MM-DD[ HH:MM:SS]).")
+    timeline.add_argument("--cidr", action="append", default=[],
+                          help="Only addresses in this network, e.g. 203.0.113.0/24 (repeatable).")
+    timeline.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    timeline.add_argument("--no-recursive", action="store_true", help="Only scan the top level of input folders.")
+    timeline.add_argument("-q", "--quiet", action="store_true", help="Do not print per-file progress.")
+    add_cache_arguments(timeline)
+    add_pipeline_arguments(timeline)
+    timeline.add_argument("--no-cache", action="store_true", help="Parse every file even if it was seen before.")
+    timeline.add_argument("--metrics", help="Write stage timings and counters to this JSON file.")
+    selfcheck = subparsers.add_parser(
+        "selfcheck", help="Compare the indicator scanner against the reference extractor on real reports.")
+    selfcheck.add_argument("paths", nargs="+", help="PDF/ZIP files or folders containing them.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.log_level:
+        set_log_level(args.log_level)
+    if args.command == "batch":
+        return run_batch(args.paths, args.output, workers=args.workers,
+                         recursive=not args.no_recursive, quiet=args.quiet, selective=not args.all_pages,
+                         cache_path=None if args.no_cache else args.cache, cache_max_mb=args.cache_max_mb,
+                         formats=args.format, sort_memory_mb=args.sort_memory_mb, collect_metrics=not args.no_metrics,
+                         pipeline_options=pipeline_options(args))
+    if args.command == "correlate":
+        return run_correlate(args.paths, workers=args.workers, recursive=not args.no_recursive, quiet=args.quiet,
+                             cache_path=None if args.no_cache else args.cache, cache_max_mb=args.cache_max_mb,
+                             indicators=args.indicator, top=args.top, show_clusters=args.clusters,
+                             fields=args.fields, min_tips=args.min_tips, max_tips=args.max_tips,
+                             metrics_path=args.metrics, pipeline_options=pipeline_options(args))
+    if args.command == "timeline":
+        try:
+            start = parse_time_bound(args.start) if args.start else None
+            end = parse_time_bound(args.end, end=True) if args.end else None
+            for network in args.cidr:
+                ipaddress.IPv4Network(network, strict=False)
+        except ValueError as e:
+            print(f"Invalid filter: {e}", file=sys.stderr)
+            return 2
+        return run_timeline(args.paths, args.output, start, end, args.cidr, workers=args.workers,
+                            recursive=not args.no_recursive, quiet=args.quiet,
+                            cache_path=None if args.no_cache else args.cache, cache_max_mb=args.cache_max_mb,
+                            metrics_path=args.metrics, pipeline_options=pipeline_options(args))
+    if args.command == "watch":
+        return run_watch(args.paths, args.output, workers=args.workers, recursive=not args.no_recursive,
+                         quiet=args.quiet, selective=not args.all_pages,
+                         cache_path=None if args.no_cache else args.cache, cache_max_mb=args.cache_max_mb,
+                         formats=args.format, interval=args.interval, settle=args.settle,
+                         use_inotify=not args.poll, once=args.once)
+    if args.command == "cache":
+        return run_cache_command(args.action, args.cache, args.cache_max_mb)
+    if args.command == "selfcheck":
+        return run_selfcheck(args.paths)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
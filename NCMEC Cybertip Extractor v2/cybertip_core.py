@@ -0,0 +1,626 @@
+import io
+import os
+import csv
+import re
+import mmap
+import shutil
+import zipfile
+import hashlib
+import logging
+import tempfile
+import time
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from bisect import bisect_right
+from datetime import datetime
+from cybertip_cache import get_cache
+from cybertip_metrics import Metrics, log_level
+
+LOG_FILE_NAME = "cybertip_parser.log"
+SUPPORTED_EXTENSIONS = ('.pdf', '.zip')
+DATA_FIELDS = ['hashes', 'ips', 'emails', 'phones', 'usernames', 'platforms']
+# Bump whenever extraction logic changes in a way the regex sources below do not capture
+PARSER_VERSION = 3
+# Hashing works through the mapped file in large slices instead of small read() calls
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+# PyMuPDF, loaded by load_fitz() when the first PDF is opened
+fitz = None
+
+# Result of parsing one input file; picklable so it can travel back from pool workers
+# members lists (name, md5, sha256) for every PDF found inside a ZIP; occurrences lists
+# (tip sha256, field, value, section letter, page) for every place an indicator was found;
+# metrics is a Metrics snapshot, or None when metrics were not collected
+FileResult = namedtuple("FileResult", ["path", "md5", "sha256", "data", "elapsed", "error", "stats", "members",
+                                       "occurrences", "metrics"])
+
+
+def load_fitz():
+    # PyMuPDF takes longer to import than everything else here together, so importing this
+    # module (in the GUI, the CLI or a fresh pool worker) does not pay for it until a PDF is read
+    global fitz
+    if fitz is None:
+        import fitz as pymupdf
+        fitz = pymupdf
+    return fitz
+
+
+def _pdf_errors():
+    # PyMuPDF's "not a PDF" error; nothing can have raised it before PyMuPDF was loaded
+    return (fitz.FileDataError,) if fitz is not None else ()
+
+
+def setup_logging():
+    log_path = os.path.join(os.getcwd(), LOG_FILE_NAME)
+    logging.basicConfig(
+        filename=log_path,
+        filemode='a',
+        format='%(asctime)s [%(levelname)s]: %(message)s',
+        level=log_level()
+    )
+    return logging.getLogger("CyberTipLogger")
+
+
+class CyberTipParser:
+    # Pre-compile regex patterns for efficiency
+    EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+    # Improved phone pattern: require word boundaries and avoid matching inside hashes or IDs
+    PHONE_PATTERN = re.compile(r"(?<![\w\d])(?:\+1[-.\s]?)?(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})(?![\w\d])")
+    HASH_PATTERN = re.compile(r"\b[a-fA-F0-9]{32}\b")
+    IP_TIME_PATTERN = re.compile(r"IP Address[:\s]*([\d.]+).*?(\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2} UTC)", re.DOTALL)
+    USERNAME_PATTERNS = [re.compile(fr"{key}\s*(\S+)") for key in ["Screen/User Name:", "Display Name:", "ESP User ID:"]]
+    NON_DIGIT_PATTERN = re.compile(r"\D")
+    # "@ilag.gov" addresses are covered by ".gov"
+    EXCLUDED_EMAIL_MARKERS = (".gov", "@ncmec.org")
+    # NCMEC's own hotline numbers
+    EXCLUDED_PHONES = frozenset({"2177829030", "8774462632"})
+    SUBMITTER_PATTERN = re.compile(r"Submitter:\s*(.*?)\n(.*?)(?:\n|$)", re.DOTALL)
+    SECTION_PATTERN = re.compile(r"Section [A-D]:.*")
+    # Guards against ZIP bombs built from archives nested inside archives
+    MAX_ZIP_DEPTH = 8
+    # ZIP members up to this size are decompressed into memory; bigger ones go to a temporary
+    # file that is mapped instead, and members that would decompress to more than the maximum
+    # are skipped. zipfile never inflates a member past the size its header declares.
+    MEMBER_MEMORY_MB = 64
+    MAX_MEMBER_MB = 4096
+
+    def __init__(self, logger=None, selective=True, cache=None, metrics=None):
+        self.data = defaultdict(set)
+        self.logger = logger or logging.getLogger("CyberTipLogger")
+        # Stop reading a report once Section D starts; nothing after it is ever parsed
+        self.selective = selective
+        self.cache = cache
+        self.cache_version = parser_fingerprint(selective) if cache is not None else None
+        self.stats = {'pages': 0, 'pages_skipped': 0, 'cache_hits': 0, 'cache_misses': 0}
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.member_hashes = []
+        self.occurrences = set()
+        # SHA-256 of the PDF currently being parsed; recorded with every occurrence
+        self.tip_hash = None
+
+    def process_file(self, path, stream=None, content_hash=None):
+        if path.lower().endswith(".zip"):
+            self.process_zip_file(path, stream)
+        elif path.lower().endswith(".pdf"):
+            self.process_pdf(path, stream, content_hash)
+
+    def process_pdf(self, path, stream=None, content_hash=None):
+        if content_hash is None:
+            content_hash = hash_buffer(stream)[1] if stream is not None else hash_file(path)[1]
+        if self.cache is None:
+            self._parse_pdf(path, stream, content_hash)
+            return
+        with self.metrics.timer('cache_lookup'):
+            cached = self.cache.get(content_hash, self.cache_version)
+        if cached is not None:
+            self.logger.info(f"Loaded cached results for {path} (SHA-256: {content_hash})")
+            data, occurrences = cached
+            merge_data(self.data, data)
+            self.occurrences.update((content_hash, *occurrence) for occurrence in occurrences)
+            self.stats['cache_hits'] += 1
+            return
+        # Parse into a fresh parser so exactly this PDF's indicators are cached
+        pdf_parser = CyberTipParser(self.logger, self.selective, metrics=self.metrics)
+        pdf_parser._parse_pdf(path, stream, content_hash)
+        self.cache.put(content_hash, self.cache_version, pdf_parser.data,
+                       [occurrence[1:] for occurrence in pdf_parser.occurrences])
+        merge_data(self.data, pdf_parser.data)
+        self.occurrences.update(pdf_parser.occurrences)
+        for key, value in pdf_parser.stats.items():
+            self.stats[key] += value
+        self.stats['cache_misses'] += 1
+
+    def _parse_pdf(self, path, stream=None, tip_hash=None):
+        self.tip_hash = tip_hash
+        with self.metrics.timer('fitz_open'):
+            pymupdf = load_fitz()
+            doc = pymupdf.open(stream=stream, filetype="pdf") if stream is not None else pymupdf.open(path)
+        try:
+            page_count = doc.page_count
+            last_page = self._section_d_page(doc) if self.selective else None
+            page_range = range(page_count if last_page is None else last_page + 1)
+            # Pages are read lazily, so only one page plus the current section is held in memory
+            if self.metrics:
+                pages = self._timed_pages(doc, page_range)
+            else:
+                pages = (doc[number].get_text("text") for number in page_range)
+            pages_read = self.extract_from_pages(pages)
+        finally:
+            doc.close()
+        skipped = page_count - pages_read
+        self.stats['pages'] += page_count
+        self.stats['pages_skipped'] += skipped
+        self.metrics.count('pdfs')
+        self.metrics.count('pages', page_count)
+        self.metrics.count('pages_read', pages_read)
+        if skipped:
+            self.logger.info(f"Skipped {skipped} of {page_count} page(s) after Section D in {path}")
+
+    def _timed_pages(self, doc, page_range):
+        timers = self.metrics.timers
+        for number in page_range:
+            start = time.perf_counter()
+            text = doc[number].get_text("text")
+            timers['fitz_text'] += time.perf_counter() - start
+            yield text
+
+    def _section_d_page(self, doc):
+        # Zero-based page on which Section D starts, if the PDF outline says so
+        try:
+            for _, title, page_number in doc.get_toc(simple=True):
+                if title.strip().startswith("Section D") and page_number > 0:
+                    return page_number - 1
+        except Exception as e:
+            self.logger.debug(f"Could not read PDF outline: {e}")
+        return None
+
+    def extract_from_pages(self, pages):
+        # Returns the number of pages consumed; stops early at Section D in selective mode
+        stream = SectionStream(self)
+        pages_read = 0
+        for page_text in pages:
+            stream.feed_page(page_text)
+            pages_read += 1
+            if self.selective and stream.in_section_d():
+                break
+        stream.close()
+        return pages_read
+
+    def extract_from_text(self, text):
+        self.extract_from_pages([text])
+
+    def _record_platform(self, submitter_match, section="", page=0):
+        platform_line = submitter_match.group(2).strip()
+        if platform_line and not platform_line.lower().startswith("point of contact"):
+            self.data['platforms'].add(platform_line)
+            self.occurrences.add((self.tip_hash, 'platforms', platform_line, section, page))
+            self.metrics.count('matches_platforms')
+
+    def parse_section(self, section_text, section="", page_offsets=None):
+        # page_offsets is (offsets, pages): page pages[i] starts at offsets[i] within section_text
+        offsets, pages = page_offsets or ((), ())
+        with self.metrics.timer('scan'):
+            found = scan_section(section_text)
+        for key, values in found.items():
+            self.data[key].update(values)
+            for value, positions in values.items():
+                for page in {pages[bisect_right(offsets, position) - 1] if offsets else 0 for position in positions}:
+                    self.occurrences.add((self.tip_hash, key, value, section, page))
+        if self.metrics:
+            # Per-value logging used to happen here; counting matches costs far less
+            counters = self.metrics.counters
+            counters['sections'] += 1
+            counters['section_chars'] += len(section_text)
+            for key, values in found.items():
+                counters[f"matches_{key}"] += sum(len(positions) for positions in values.values())
+
+    def process_zip_file(self, path, stream=None):
+        with zipfile.ZipFile(stream if stream is not None else path, 'r') as zip_ref:
+            for member_name, pdf_bytes in self.iter_zip_pdfs(zip_ref):
+                with memoryview(pdf_bytes) as view:
+                    with self.metrics.timer('hash'):
+                        md5_hash, sha256_hash = hash_buffer(view)
+                    self.metrics.count('zip_members')
+                    self.member_hashes.append((member_name, md5_hash, sha256_hash))
+                    self.logger.info(f"Processing PDF file in ZIP: {member_name} "
+                                     f"(MD5: {md5_hash}, SHA-256: {sha256_hash})")
+                    self.process_pdf(member_name, stream=view, content_hash=sha256_hash)
+
+    def iter_zip_pdfs(self, zip_ref, prefix="", depth=0):
+        # Members are filtered by name before anything is decompressed, and PDFs are read
+        # straight into memory (or a mapped temporary file when large), so attachments are
+        # never extracted next to the evidence. Each buffer is only valid until the next one.
+        for info in zip_ref.infolist():
+            if info.is_dir():
+                continue
+            member_name = prefix + info.filename
+            lower_name = info.filename.lower()
+            if not lower_name.endswith((".pdf", ".zip")):
+                self.logger.warning(f"Skipped unsupported file type in ZIP: {member_name}")
+                continue
+            if info.file_size > self.MAX_MEMBER_MB * 1024 * 1024:
+                self.logger.warning(f"Skipped {member_name}: decompresses to {info.file_size} bytes, "
+                                    f"more than {self.MAX_MEMBER_MB} MB")
+                continue
+            if lower_name.endswith(".pdf"):
+                with self._member_buffer(zip_ref, info) as buffer:
+                    yield member_name, buffer
+                continue
+            if depth >= self.MAX_ZIP_DEPTH:
+                self.logger.warning(f"Skipped nested ZIP deeper than {self.MAX_ZIP_DEPTH} levels: {member_name}")
+                continue
+            try:
+                with self._member_buffer(zip_ref, info) as buffer:
+                    source = io.BytesIO(buffer) if isinstance(buffer, bytes) else buffer
+                    with zipfile.ZipFile(source) as nested:
+                        yield from self.iter_zip_pdfs(nested, member_name + "/", depth + 1)
+            except zipfile.BadZipFile as e:
+                self.logger.warning(f"Skipped unreadable nested ZIP {member_name}: {e}")
+
+    @contextmanager
+    def _member_buffer(self, zip_ref, info):
+        if info.file_size <= self.MEMBER_MEMORY_MB * 1024 * 1024:
+            yield zip_ref.read(info)
+            return
+        self.metrics.count('zip_members_spilled')
+        with tempfile.TemporaryFile() as spill:
+            with zip_ref.open(info) as member:
+                shutil.copyfileobj(member, spill, HASH_CHUNK_SIZE)
+            spill.flush()
+            if not spill.tell():
+                yield b""
+                return
+            with _MappedFile(spill.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+
+@lru_cache(maxsize=65536)
+def _normalize_timestamp(timestamp):
+    # "MM-DD-YYYY HH:MM:SS UTC" -> "YYYY-MM-DD HH:MM:SS". The pattern fixes every field's
+    # position, so the fields are sliced out and only validated (no strptime/strftime);
+    # report timestamps also repeat a lot, hence the cache.
+    year = int(timestamp[6:10])
+    try:
+        datetime(year, int(timestamp[0:2]), int(timestamp[3:5]),
+                 int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:19]))
+    except ValueError:
+        return None
+    return f"{year}-{timestamp[0:2]}-{timestamp[3:5]} {timestamp[11:19]}"
+
+
+def _hash_windows(hashes, length):
+    # Every substring of the given length of every hash, so "is this phone part of a hash"
+    # becomes one set lookup instead of a scan over all hashes in the section
+    return {h[i:i + length] for h in hashes for i in range(len(h) - length + 1)}
+
+
+def scan_section(section_text):
+    # Extracts every indicator type from one section as {field: {value: [match positions]}}.
+    # The text is scanned once per pattern (seven regex scans, run in C); all filtering then
+    # happens on the (few) matches rather than by rescanning the text.
+    patterns = CyberTipParser
+    found = {}
+    hashes = {}
+    for match in patterns.HASH_PATTERN.finditer(section_text):
+        hashes.setdefault(match.group(), []).append(match.start())
+    found['hashes'] = hashes
+    ips = {}
+    for match in patterns.IP_TIME_PATTERN.finditer(section_text):
+        ts_clean = _normalize_timestamp(match.group(2))
+        if ts_clean is not None:
+            ips.setdefault(f"{match.group(1)} → {ts_clean}", []).append(match.start())
+    if ips:
+        found['ips'] = ips
+    emails = {}
+    for match in patterns.EMAIL_PATTERN.finditer(section_text):
+        emails.setdefault(match.group(), []).append(match.start())
+    for email in list(emails):
+        lower_email = email.lower()
+        if any(marker in lower_email for marker in patterns.EXCLUDED_EMAIL_MARKERS):
+            del emails[email]
+    found['emails'] = emails
+    phones = {}
+    for match in patterns.PHONE_PATTERN.finditer(section_text):
+        phones.setdefault(match.group(1), []).append(match.start(1))
+    windows = {}
+    for phone in list(phones):
+        digits_only = patterns.NON_DIGIT_PATTERN.sub("", phone)
+        if digits_only in patterns.EXCLUDED_PHONES:
+            del phones[phone]
+        elif hashes:
+            length = len(digits_only)
+            if length not in windows:
+                windows[length] = _hash_windows(hashes, length)
+            if digits_only in windows[length]:
+                del phones[phone]
+    found['phones'] = phones
+    usernames = {}
+    for pattern in patterns.USERNAME_PATTERNS:
+        for match in pattern.finditer(section_text):
+            usernames.setdefault(match.group(1), []).append(match.start(1))
+    found['usernames'] = usernames
+    return found
+
+
+class SectionStream:
+    # Splits a report into sections as pages arrive instead of joining the whole document first.
+    # Sections A-C are buffered and handed to parse_section when the next header (or the end of
+    # the report) is reached; very long sections are parsed in overlapping chunks so memory stays
+    # bounded. Section D and text before the first header are never buffered.
+    PARSED_SECTIONS = ("Section A", "Section B", "Section C")
+    CHUNK_CHARS = 1_000_000
+    # Overlap carried into the next chunk so matches spanning a chunk boundary are still found
+    OVERLAP_CHARS = 20_000
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.section = None
+        self.pieces = []
+        self.size = 0
+        self.pages = 0
+        # Where each page starts inside the buffered section text, for page provenance
+        self.page_offsets = []
+        self.page_numbers = []
+        # Unresolved tail of the Submitter block; None once the platform has been looked up
+        self.submitter_text = ""
+        self.submitter_origin = ("", 0)
+
+    def feed_page(self, page_text):
+        # Pages are separated by newlines, exactly as when the full text was joined
+        if self.pages:
+            page_text = "\n" + page_text
+        self.pages += 1
+        section_at_start = self.section
+        headers = list(self.parser.SECTION_PATTERN.finditer(page_text))
+        position = 0
+        for match in headers:
+            self._append(page_text[position:match.start()])
+            self._end_section()
+            self.section = match.group().strip()
+            position = match.end()
+        self._append(page_text[position:])
+        self._scan_submitter(page_text, section_at_start, headers)
+
+    def close(self):
+        self._end_section()
+        self._scan_submitter("", final=True)
+
+    def section_letter(self, section):
+        # "Section B: Suspect" -> "B"; "" before the first header
+        return section[8] if section else ""
+
+    def in_section_d(self):
+        return self.section is not None and self.section.startswith("Section D")
+
+    def in_parsed_section(self):
+        return self.section is not None and self.section.startswith(self.PARSED_SECTIONS)
+
+    def _append(self, text):
+        if not text or not self.in_parsed_section():
+            return
+        if not self.page_numbers or self.page_numbers[-1] != self.pages:
+            self.page_offsets.append(self.size)
+            self.page_numbers.append(self.pages)
+        self.pieces.append(text)
+        self.size += len(text)
+        if self.size > self.CHUNK_CHARS:
+            chunk = "".join(self.pieces)
+            self._parse(chunk)
+            # Restart the carried overlap on a line boundary so no token is cut in half
+            cut = chunk.find("\n", len(chunk) - self.OVERLAP_CHARS)
+            if cut == -1:
+                cut = len(chunk)
+            carry = chunk[cut:]
+            first = max(bisect_right(self.page_offsets, cut) - 1, 0)
+            self.page_offsets = [0] + [offset - cut for offset in self.page_offsets[first + 1:]]
+            self.page_numbers = self.page_numbers[first:]
+            self.pieces = [carry]
+            self.size = len(carry)
+
+    def _end_section(self):
+        if self.in_parsed_section():
+            self._parse("".join(self.pieces))
+        self.pieces = []
+        self.size = 0
+        self.page_offsets = []
+        self.page_numbers = []
+
+    def _parse(self, text):
+        stripped = text.strip()
+        lead = len(text) - len(text.lstrip())
+        offsets = [offset - lead for offset in self.page_offsets]
+        self.parser.parse_section(stripped, self.section_letter(self.section), (offsets, self.page_numbers))
+
+    def _origin(self, position, section_at_start, headers):
+        # Section letter and page number of a position inside the current page
+        section = section_at_start
+        for match in headers:
+            if match.start() > position:
+                break
+            section = match.group().strip()
+        return self.section_letter(section), self.pages
+
+    def _scan_submitter(self, text, section_at_start=None, headers=(), final=False):
+        if self.submitter_text is None:
+            return
+        carried = len(self.submitter_text)
+        buffer = self.submitter_text + text
+        match = self.parser.SUBMITTER_PATTERN.search(buffer)
+        # A match that reaches the end of the buffer may still change once the next page arrives
+        if match and (final or match.end() < len(buffer)):
+            if match.start() >= carried:
+                self.submitter_origin = self._origin(match.start() - carried, section_at_start, headers)
+            self.parser._record_platform(match, *self.submitter_origin)
+            self.submitter_text = None
+        elif final:
+            self.submitter_text = None
+        else:
+            start = buffer.find("Submitter:")
+            if start >= carried:
+                self.submitter_origin = self._origin(start - carried, section_at_start, headers)
+            self.submitter_text = buffer[start:] if start != -1 else ""
+
+
+def parser_fingerprint(selective=True):
+    # Changes whenever the extraction rules change, so results cached by older rules are never reused
+    patterns = [value for value in vars(CyberTipParser).values() if isinstance(value, re.Pattern)]
+    patterns += CyberTipParser.USERNAME_PATTERNS
+    parts = [str(PARSER_VERSION), "selective" if selective else "all-pages"]
+    parts += sorted(f"{pattern.pattern}/{pattern.flags}" for pattern in patterns)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class _MappedFile(mmap.mmap):
+    # zipfile wants a seekable file object; an mmap is one in all but name
+    def seekable(self):
+        return True
+
+
+@contextmanager
+def map_file(path):
+    # Maps the file read-only so hashing and parsing share one read of the data
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def hash_buffer(buffer):
+    # MD5 and SHA-256 together: each slice is fed to both while it is still in the CPU cache
+    hash_md5 = hashlib.md5()
+    hash_sha256 = hashlib.sha256()
+    with memoryview(buffer) as view:
+        for offset in range(0, len(view), HASH_CHUNK_SIZE):
+            chunk = view[offset:offset + HASH_CHUNK_SIZE]
+            hash_md5.update(chunk)
+            hash_sha256.update(chunk)
+            chunk.release()
+    return hash_md5.hexdigest(), hash_sha256.hexdigest()
+
+
+def hash_file(path):
+    with map_file(path) as buffer:
+        return hash_buffer(buffer)
+
+
+def extract_file(path, selective=True, cache_path=None, metrics=False, data=None):
+    # Indicators of one PDF or ZIP as a FileResult; raises if the file cannot be read.
+    # data is the file's content when the caller has already read it (see cybertip_pipeline)
+    logger = logging.getLogger("CyberTipLogger")
+    start = time.time()
+    file_metrics = Metrics(enabled=metrics)
+    with map_file(path) if data is None else nullcontext(data) as buffer:
+        # Compute and log hashes before processing; the parser then reads the same mapping
+        with file_metrics.timer('hash'):
+            md5_hash, sha256_hash = hash_buffer(buffer)
+        file_metrics.count('files')
+        file_metrics.count('bytes_read', len(buffer))
+        logger.info(f"MD5 hash for {path}: {md5_hash}")
+        logger.info(f"SHA-256 hash for {path}: {sha256_hash}")
+        logger.info(f"Starting processing: {path}")
+        cache = get_cache(cache_path) if cache_path else None
+        parser = CyberTipParser(logger, selective=selective, cache=cache, metrics=file_metrics)
+        if path.lower().endswith(".pdf"):
+            # fitz takes a memoryview of the mapping without another read from disk
+            with memoryview(buffer) as view:
+                parser.process_pdf(path, stream=view, content_hash=sha256_hash)
+        else:
+            parser.process_file(path, stream=buffer if data is None else io.BytesIO(data))
+    elapsed = time.time() - start
+    file_metrics.add_time('parse_file', elapsed)
+    logger.info(f"Finished processing: {path} in {elapsed:.2f} seconds")
+    return FileResult(path, md5_hash, sha256_hash, dict(parser.data), elapsed, None,
+                      parser.stats, parser.member_hashes, sorted(parser.occurrences), file_metrics.snapshot())
+
+
+def extract_from_pdf(path, selective=True, cache_path=None):
+    # Library entry point: everything extracted from one CyberTip PDF, without the GUI.
+    # data maps each field to its values; occurrences says where each value was found.
+    if not path.lower().endswith(".pdf"):
+        raise ValueError(f"Not a PDF file: {path}")
+    return extract_file(path, selective, cache_path)
+
+
+def parse_file(path, selective=True, cache_path=None, metrics=False, data=None):
+    # Top-level so it can be pickled and run inside a process pool worker; errors are
+    # returned in the FileResult instead of raised
+    logger = logging.getLogger("CyberTipLogger")
+    start = time.time()
+    try:
+        return extract_file(path, selective, cache_path, metrics, data)
+    except (OSError, zipfile.BadZipFile, *_pdf_errors()) as e:
+        logger.error(f"File I/O or format error for {path}: {e}")
+        return FileResult(path, None, None, {}, time.time() - start, str(e), {}, [], [], None)
+    except Exception as e:
+        logger.error(f"Failed to process {path}: {e}")
+        return FileResult(path, None, None, {}, time.time() - start, str(e), {}, [], [], None)
+
+
+def merge_data(target, data):
+    for key, values in data.items():
+        target[key].update(values)
+
+
+def is_supported(path):
+    return path.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def collect_files(paths, recursive=True):
+    files = []
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                candidates = [os.path.join(dirpath, name)
+                              for dirpath, _, names in os.walk(path) for name in sorted(names)]
+            else:
+                candidates = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            key = os.path.abspath(candidate)
+            if is_supported(candidate) and key not in seen:
+                seen.add(key)
+                files.append(candidate)
+    return files
+
+
+def _ip_order(item):
+    # "YYYY-MM-DD HH:MM:SS" timestamps sort chronologically as plain strings
+    return item.rpartition("→")[2].strip(), item
+
+
+def value_sort_key(key):
+    # IPs are ordered by timestamp, everything else alphabetically
+    return _ip_order if key == "ips" else None
+
+
+def sorted_values(key, values):
+    return sorted(values, key=value_sort_key(key))
+
+
+def write_hash_manifest(results, filename, append=False):
+    # One row per input file and per PDF found inside a ZIP, for the evidence report
+    header = not append or not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with open(filename, 'a' if append else 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(["file", "member", "md5", "sha256"])
+        for result in results:
+            writer.writerow([result.path, "", result.md5, result.sha256])
+            for member_name, md5_hash, sha256_hash in result.members:
+                writer.writerow([result.path, member_name, md5_hash, sha256_hash])
+
+
+def write_txt_exports(data, directory, logger=None, append=False):
+    # With append, the values are added to the end of the files as given instead of sorted
+    logger = logger or logging.getLogger("CyberTipLogger")
+    for key, values in data.items():
+        filename = os.path.join(directory, f"{key}.txt")
+        items = list(values) if append else sorted_values(key, values)
+        with open(filename, 'a' if append else 'w', encoding='utf-8') as f:
+            for item in items:
+                f.write(item + "\n")
+        logger.info(f"{'Appended' if append else 'Exported'} {len(items)} items to {filename}")
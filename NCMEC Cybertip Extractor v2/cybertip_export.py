@@ -0,0 +1,247 @@
+import os
+import csv
+import json
+import heapq
+import logging
+import marshal
+import sqlite3
+import tempfile
+from itertools import islice
+
+from cybertip_core import DATA_FIELDS, value_sort_key
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'sqlite')
+EXPORT_EXTENSIONS = {'csv': '.csv', 'jsonl': '.jsonl', 'sqlite': '.sqlite3'}
+EXPORT_COLUMNS = ["type", "value", "timestamp_utc", "tip_sha256", "tip", "section", "page"]
+DEFAULT_SORT_MEMORY_MB = 256
+# Rough size of one record held while sorting (key tuple, strings and list slot)
+SORT_RECORD_BYTES = 256
+# Rows handed to a writer at a time
+BATCH_ROWS = 10000
+# Sorted runs merged at once by the external sort
+MERGE_FAN_IN = 64
+
+
+def export_format(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        return 'csv'
+    if ext in (".jsonl", ".json", ".ndjson"):
+        return 'jsonl'
+    if ext in (".sqlite", ".sqlite3", ".db"):
+        return 'sqlite'
+    raise ValueError(f"Unknown export format for {filename}; use .csv, .jsonl or .sqlite3")
+
+
+def external_sort(records, max_records, tmpdir=None):
+    # Yields records in sorted order while holding at most max_records of them in memory.
+    # Anything larger is cut into sorted runs that are spilled to temporary files and then
+    # merged; records must be marshal-able (tuples of strings and numbers).
+    run = []
+    run_paths = []
+    # Runs are read back a chunk at a time during the merge, so the chunks of all runs
+    # together stay within the budget for up to MERGE_FAN_IN runs
+    chunk_size = max(16, min(BATCH_ROWS, max_records // MERGE_FAN_IN))
+    try:
+        for record in records:
+            run.append(record)
+            if len(run) >= max_records:
+                run.sort()
+                run_paths.append(_spill(run, tmpdir, chunk_size))
+                run = []
+        run.sort()
+        if not run_paths:
+            yield from run
+            return
+        if run:
+            run_paths.append(_spill(run, tmpdir, chunk_size))
+            run = []
+        # Never more than MERGE_FAN_IN runs are open at once: while there are more, the oldest
+        # ones are merged into a new run (each record is written once more per pass)
+        while len(run_paths) > MERGE_FAN_IN:
+            group = run_paths[:MERGE_FAN_IN]
+            merged = _spill(_merge_runs(group), tmpdir, chunk_size)
+            run_paths = run_paths[MERGE_FAN_IN:] + [merged]
+            for path in group:
+                os.remove(path)
+        yield from _merge_runs(run_paths)
+    finally:
+        for path in run_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _spill(records, tmpdir, chunk_size):
+    # Writes records (already sorted) to a new run file and returns its path
+    records = iter(records)
+    with tempfile.NamedTemporaryFile(prefix="cybertip_sort_", suffix=".run", dir=tmpdir, delete=False) as f:
+        try:
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+                marshal.dump(chunk, f)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    return f.name
+
+
+def _merge_runs(paths):
+    readers = [_read_run(path) for path in paths]
+    try:
+        yield from heapq.merge(*readers)
+    finally:
+        # Closes the run files now, not when the readers are garbage collected, so they can be removed
+        for reader in readers:
+            reader.close()
+
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                chunk = marshal.load(f)
+            except EOFError:
+                return
+            yield from chunk
+
+
+def iter_occurrence_rows(store, fields=None, memory_mb=DEFAULT_SORT_MEMORY_MB, tmpdir=None):
+    # One row per occurrence, ordered by type, then value (IPs by time), then arrival.
+    # Only the sort keys of one field's values are ever held in memory, and those spill to
+    # disk once they exceed memory_mb.
+    max_records = max(1000, int(memory_mb * 1024 * 1024) // SORT_RECORD_BYTES)
+    # Occurrences added while exporting (e.g. by a running ingestion) are left out
+    limit = store.occurrence_count()
+    sections = store.SECTIONS
+    occ_tip, occ_section, occ_page = store.occ_tip, store.occ_section, store.occ_page
+    for field in fields or DATA_FIELDS:
+        texts = store.values(field)
+        key = value_sort_key(field)
+        records = ((key(value) if key else value, value_id)
+                   for value_id, value in enumerate(islice(texts, len(texts))))
+        for _, value_id in external_sort(records, max_records, tmpdir):
+            value = texts[value_id]
+            timestamp = ""
+            if field == 'ips':
+                value, _, timestamp = value.partition(" → ")
+            for row in store.occurrence_rows(field, value_id):
+                if row >= limit:
+                    continue
+                tip_id = occ_tip[row]
+                yield (field, value, timestamp, store.tip_hashes[tip_id], store.tip_names[tip_id],
+                       sections[occ_section[row]], occ_page[row])
+
+
+def iter_new_rows(store, first_row):
+    # Rows for the occurrences added since first_row, in arrival order, for appending to an
+    # earlier export without sorting or rewriting it
+    sections = store.SECTIONS
+    for row in range(first_row, store.occurrence_count()):
+        field = DATA_FIELDS[store.occ_field[row]]
+        value = store.values(field)[store.occ_value[row]]
+        timestamp = ""
+        if field == 'ips':
+            value, _, timestamp = value.partition(" → ")
+        tip_id = store.occ_tip[row]
+        yield (field, value, timestamp, store.tip_hashes[tip_id], store.tip_names[tip_id],
+               sections[store.occ_section[row]], store.occ_page[row])
+
+
+def _batches(rows):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_ROWS))
+        if not batch:
+            return
+        yield batch
+
+
+def write_csv(rows, filename, append=False):
+    count = 0
+    header = not append or not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with open(filename, 'a' if append else 'w', encoding='utf-8', newline='', buffering=1024 * 1024) as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(EXPORT_COLUMNS)
+        for batch in _batches(rows):
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+
+def write_jsonl(rows, filename, append=False):
+    # The column layout is fixed, so each line is formatted directly and only the strings
+    # go through the (C) JSON string encoder
+    count = 0
+    quote = json.encoder.encode_basestring
+    with open(filename, 'a' if append else 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+        for batch in _batches(rows):
+            f.write("".join(
+                f'{{"type": {quote(field)}, "value": {quote(value)}, "timestamp_utc": {quote(timestamp)}, '
+                f'"tip_sha256": {quote(tip_hash)}, "tip": {quote(tip)}, "section": {quote(section)}, '
+                f'"page": {page}}}\n'
+                for field, value, timestamp, tip_hash, tip, section, page in batch))
+            count += len(batch)
+    return count
+
+
+def write_sqlite(rows, filename, append=False):
+    if os.path.exists(filename) and not append:
+        os.remove(filename)
+    count = 0
+    conn = sqlite3.connect(filename)
+    try:
+        if not append:
+            # A fresh export file needs no crash safety, only speed
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS occurrences (
+                type TEXT NOT NULL,
+                value TEXT NOT NULL,
+                timestamp_utc TEXT,
+                tip_sha256 TEXT NOT NULL,
+                tip TEXT,
+                section TEXT,
+                page INTEGER
+            )""")
+        with conn:
+            for batch in _batches(rows):
+                conn.executemany("INSERT INTO occurrences VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                count += len(batch)
+        # Indexes are built once at the end, which is much faster than maintaining them per row;
+        # appends then keep the existing indexes up to date
+        with conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS occurrences_value ON occurrences (type, value)")
+            conn.execute("CREATE INDEX IF NOT EXISTS occurrences_tip ON occurrences (tip_sha256)")
+            conn.execute("CREATE INDEX IF NOT EXISTS occurrences_time ON occurrences (timestamp_utc)")
+    finally:
+        conn.close()
+    return count
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'sqlite': write_sqlite}
+
+
+def export_occurrences(store, filename, fmt=None, fields=None, memory_mb=DEFAULT_SORT_MEMORY_MB, logger=None):
+    # Streams every occurrence with its tip, section and timestamp to a CSV, JSONL or SQLite file
+    logger = logger or logging.getLogger("CyberTipLogger")
+    fmt = fmt or export_format(filename)
+    # Sort runs are spilled next to the output so they land on the same disk
+    tmpdir = os.path.dirname(os.path.abspath(filename))
+    count = WRITERS[fmt](iter_occurrence_rows(store, fields, memory_mb, tmpdir), filename)
+    logger.info(f"Exported {count} occurrences to {filename}")
+    return count
+
+
+def append_occurrences(store, filename, first_row, fmt=None, logger=None):
+    # Adds the occurrences from first_row on to an existing CSV, JSONL or SQLite export. Appended
+    # rows follow ingestion order rather than the sorted order of a full export.
+    logger = logger or logging.getLogger("CyberTipLogger")
+    fmt = fmt or export_format(filename)
+    count = WRITERS[fmt](iter_new_rows(store, first_row), filename, append=True)
+    logger.info(f"Appended {count} occurrences to {filename}")
+    return count
@@ -0,0 +1,599 @@
+import os
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+from tkinterdnd2 import TkinterDnD
+import platform
+import socket
+import time
+import queue
+import threading
+import multiprocessing
+import ipaddress
+from tkinter import simpledialog
+from cybertip_core import LOG_FILE_NAME, setup_logging, value_sort_key, write_txt_exports
+from cybertip_cache import ResultCache, default_cache_path
+from cybertip_store import IndicatorStore, write_ip_timeline
+from cybertip_listview import VirtualListView
+from cybertip_export import export_occurrences
+from cybertip_metrics import Metrics, METRICS_FILE_NAME
+from cybertip_pipeline import IngestPipeline, pipeline_options_from_env
+
+class CyberTipExtractorApp:
+    # How often the GUI drains finished results from the background ingestion thread
+    POLL_INTERVAL_MS = 100
+    MAX_RESULTS_PER_POLL = 50
+
+    def __init__(self, root):
+        self.root = root
+        self.root.title("CyberTip Extractor v2.0")
+        self.root.geometry("800x850")
+        self.store = IndicatorStore()
+        self.loaded_files = set()
+        self.dark_mode = False
+        self.result_queue = queue.Queue()
+        self.ingest_thread = None
+        self.cancel_event = threading.Event()
+        self.ingest_generation = 0
+        self.cache_path = default_cache_path()
+        self.export_thread = None
+        self.metrics = Metrics()
+        self.setup_logging()
+        self.log_system_info()
+        self._build_gui()
+        self.logger.info("GUI started.")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def setup_logging(self):
+        self.logger = setup_logging()
+        self.logger.info("Logging initialized.")
+
+    def log_system_info(self):
+        try:
+            computer_name = socket.gethostname()
+            user = os.environ.get('USERNAME') or os.environ.get('USER')
+            sys_info = platform.platform()
+            self.logger.info(f"System Info: Computer Name: {computer_name}, User: {user}, Platform: {sys_info}")
+        except Exception as e:
+            self.logger.warning(f"Failed to log system info: {e}")
+
+    def on_close(self):
+        self.cancel_event.set()
+        self.logger.info("GUI closed.")
+        self.root.destroy()
+
+    def _build_gui(self):
+        self.main_frame = tk.Frame(self.root)
+        self.main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Menu bar with Help/About
+        menubar = tk.Menu(self.root)
+        helpmenu = tk.Menu(menubar, tearoff=0)
+        helpmenu.add_command(label="About", command=self.show_about)
+        helpmenu.add_command(label="Instructions", command=self.show_instructions)
+        menubar.add_cascade(label="Help", menu=helpmenu)
+        # Dark mode toggle
+        viewmenu = tk.Menu(menubar, tearoff=0)
+        viewmenu.add_command(label="Toggle Dark Mode", command=self.toggle_dark_mode)
+        menubar.add_cascade(label="View", menu=viewmenu)
+        analysismenu = tk.Menu(menubar, tearoff=0)
+        analysismenu.add_command(label="Shared Indicators", command=self.show_shared_indicators)
+        analysismenu.add_command(label="Tip Clusters", command=self.show_tip_clusters)
+        analysismenu.add_command(label="Export IP Timeline...", command=self.export_ip_timeline)
+        analysismenu.add_command(label="Export All Occurrences...", command=self.export_occurrences)
+        menubar.add_cascade(label="Analysis", menu=analysismenu)
+        self.root.config(menu=menubar)
+
+        self.canvas = tk.Canvas(self.main_frame)
+        self.scrollbar = ttk.Scrollbar(self.main_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.scrollable_frame = tk.Frame(self.canvas)
+
+        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.drop_area = tk.Label(self.scrollable_frame, text="Drop PDF or ZIP files here", bg="#e0e0e0", width=70, height=5, relief="ridge")
+        self.drop_area.grid(row=1, column=0, columnspan=4, pady=5)
+        self.drop_area.drop_target_register('DND_Files')
+        self.drop_area.dnd_bind('<<Drop>>', self.handle_drop)
+        self._add_tooltip(self.drop_area, "Drag and drop PDF or ZIP files here to extract data.")
+
+        # Row 2: Select Files and Select Folder side by side
+        btn_select_menu = tk.Menubutton(self.scrollable_frame, text="Select Files/Folder", relief=tk.RAISED)
+        select_menu = tk.Menu(btn_select_menu, tearoff=0)
+        select_menu.add_command(label="Select Files", command=self.select_files)
+        select_menu.add_command(label="Select Folder", command=self.select_folder)
+        btn_select_menu.config(menu=select_menu)
+        btn_select_menu.grid(row=2, column=0, pady=5)
+        self._add_tooltip(btn_select_menu, "Select PDF/ZIP files or a folder containing them.")
+        btn_clear = tk.Button(self.scrollable_frame, text="Clear Loaded Files", command=self.clear_files)
+        btn_clear.grid(row=2, column=1, pady=5)
+        self._add_tooltip(btn_clear, "Clear all loaded files and extracted data.")
+        btn_export = tk.Button(self.scrollable_frame, text="Export to TXT", command=self.export_to_txt)
+        btn_export.grid(row=2, column=2, pady=5)
+        self._add_tooltip(btn_export, "Export extracted data to TXT files.")
+        btn_log = tk.Button(self.scrollable_frame, text="Export Log", command=self.export_log)
+        btn_log.grid(row=2, column=3, pady=5)
+        self._add_tooltip(btn_log, "Export the application log file.")
+
+        tk.Label(self.scrollable_frame, text="Loaded Files (with MD5/SHA-256 Hashes):").grid(row=3, column=0, sticky='w')
+        self.file_listbox = tk.Listbox(self.scrollable_frame, width=100, height=6)
+        self.file_listbox.grid(row=4, column=0, columnspan=4, pady=5)
+
+        self.data_views = {}
+        self.export_buttons = {}
+        self.copy_buttons = {}
+        data_fields = ['hashes', 'ips', 'emails', 'phones', 'usernames', 'platforms']
+        for idx, field in enumerate(data_fields):
+            row = 6 + (idx // 2) * 2
+            col = (idx % 2) * 2
+            label_text = 'IPs' if field == 'ips' else field.title()
+            tk.Label(self.scrollable_frame, text=label_text + ":").grid(row=row, column=col, sticky='w')
+            # Only the visible rows are ever inserted into the Tk widget; the box above it filters the list
+            view = VirtualListView(self.scrollable_frame, sort_key=value_sort_key(field), width=40, height=6)
+            view.grid(row=row+1, column=col, padx=10, pady=5)
+            self._add_tooltip(view.filter_entry, f"Type to filter {label_text}.")
+            self.data_views[field] = view
+            # Export button for each data type (right of listbox)
+            btn_export_type_text = f"Export IPs" if field == 'ips' else f"Export {field.title()}"
+            btn_export_type = tk.Button(self.scrollable_frame, text=btn_export_type_text, command=lambda f=field: self.export_single_type(f))
+            btn_export_type.grid(row=row+1, column=col+1, padx=5, pady=5, sticky='w')
+            self._add_tooltip(btn_export_type, f"Export only {label_text} to a TXT file.")
+            self.export_buttons[field] = btn_export_type
+            # Add right-click context menu for Copy All
+            menu = tk.Menu(view.listbox, tearoff=0)
+            menu.add_command(label="Copy All", command=lambda f=field: self.copy_all_to_clipboard(f))
+            menu.add_command(label="Show Source Tips", command=lambda f=field: self.show_sources(f))
+            def show_menu(event, m=menu):
+                m.tk_popup(event.x_root, event.y_root)
+            view.bind("<Button-3>", show_menu)
+
+        # Place status and progress bar after all data fields
+        last_row = 6 + ((len(data_fields) + 1) // 2) * 2  # Find the next available row after all data fields
+        self.status = tk.Label(self.scrollable_frame, text="Ready.", fg="green")
+        self.status.grid(row=last_row, column=0, columnspan=4, pady=10)
+        self.progress = ttk.Progressbar(self.scrollable_frame, orient=tk.HORIZONTAL, length=600, mode='determinate')
+        self.progress.grid(row=last_row+1, column=0, columnspan=4, pady=10)
+        self.btn_cancel = tk.Button(self.scrollable_frame, text="Cancel", command=self.cancel_ingest, state=tk.DISABLED)
+        self.btn_cancel.grid(row=last_row+2, column=0, columnspan=4, pady=5)
+        self._add_tooltip(self.btn_cancel, "Stop processing the remaining files. Results already shown are kept.")
+
+    def _add_tooltip(self, widget, text):
+        tooltip = tk.Toplevel(widget)
+        tooltip.withdraw()
+        tooltip.overrideredirect(True)
+        label = tk.Label(tooltip, text=text, background='#ffffe0', relief='solid', borderwidth=1, font=(None, 9))
+        label.pack(ipadx=1)
+        def enter(event):
+            x = event.x_root + 10
+            y = event.y_root + 10
+            tooltip.geometry(f'+{x}+{y}')
+            tooltip.deiconify()
+        def leave(event):
+            tooltip.withdraw()
+        widget.bind('<Enter>', enter)
+        widget.bind('<Leave>', leave)
+
+    def show_about(self):
+        messagebox.showinfo(
+            "About",
+            "CyberTip Extractor\nVersion 2.0\nDeveloped by DarkKnightForensics\nhttps://github.com/DarkKnightForensics"
+        )
+
+    def show_instructions(self):
+        messagebox.showinfo("Instructions", "1. Drag and drop or select PDF/ZIP files.\n2. Extracted data will appear below.\n3. Use Export to TXT to save results.\n4. Use Export Log to save the log file.")
+
+    def export_log(self):
+        log_path = os.path.join(os.getcwd(), LOG_FILE_NAME)
+        dest = filedialog.asksaveasfilename(defaultextension=".log", filetypes=[("Log Files", "*.log"), ("All Files", "*.*")])
+        if dest:
+            try:
+                with open(log_path, "r", encoding="utf-8") as src, open(dest, "w", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                messagebox.showinfo("Export Log", f"Log exported to {dest}")
+            except Exception as e:
+                messagebox.showerror("Export Log Error", f"Failed to export log: {e}")
+
+    def export_to_txt(self):
+        directory = filedialog.askdirectory(title="Select folder to export .txt files")
+        if not directory:
+            return
+        try:
+            start = time.time()
+            self.logger.info(f"Starting export to: {directory}")
+            write_txt_exports(self.store.to_data(), directory, self.logger)
+            elapsed = time.time() - start
+            messagebox.showinfo("Export Complete", f"Data exported to {directory}")
+            self.logger.info(f"Exported data to: {directory} in {elapsed:.2f} seconds")
+        except Exception as e:
+            self.logger.error(f"Failed to export data: {e}")
+            messagebox.showerror("Export Error", f"An error occurred while exporting:\n{e}")
+
+    def export_single_type(self, key):
+        values = self.data_views[key].all_items()
+        if not values:
+            messagebox.showinfo("Export", f"No {key} data to export.")
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text Files", "*.txt")], title=f"Export {key.title()} to TXT")
+        if not filename:
+            return
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                for item in values:
+                    f.write(item + "\n")
+            self.logger.info(f"Exported {len(values)} {key} items to {filename}")
+            messagebox.showinfo("Export Complete", f"Exported {len(values)} {key} items to {filename}")
+        except Exception as e:
+            self.logger.error(f"Failed to export {key}: {e}")
+            messagebox.showerror("Export Error", f"An error occurred while exporting {key}:\n{e}")
+
+    def copy_all_to_clipboard(self, key):
+        values = self.data_views[key].all_items()
+        if not values:
+            self.status.config(text=f"No {key} data to copy.", fg="orange")
+            return
+        self.root.clipboard_clear()
+        self.root.clipboard_append('\n'.join(values))
+        self.status.config(text=f"Copied all {key} to clipboard!", fg="green")
+
+    def show_sources(self, key):
+        value = self.data_views[key].get_selected()
+        if value is None:
+            self.status.config(text=f"Select an item in {key} first.", fg="orange")
+            return
+        lines = []
+        for tip_hash, name, section, page in self.store.occurrences(key, value):
+            location = f"Section {section}, page {page}" if section else f"page {page}"
+            lines.append(f"{os.path.basename(name)}  |  {location}  |  SHA-256: {tip_hash}")
+        tips = self.store.tips_containing(key, value)
+        if key == 'ips' and len(tips) > 1:
+            lines.append("")
+            lines.append(f"The address {self.store.correlation_key(key, value)} appears in {len(tips)} tips:")
+            lines.extend(f"    {os.path.basename(name)}  |  SHA-256: {tip_hash}" for tip_hash, name in tips)
+        self._show_list_window(f"Source Tips: {value}", f"{value} was found in:", lines)
+
+    def show_shared_indicators(self):
+        lines = [f"{count:>6} tips  |  {field:<10} {value}"
+                 for field, value, count in self.store.shared_indicators(limit=500)]
+        if not lines:
+            self.status.config(text="No indicator appears in more than one tip.", fg="orange")
+            return
+        self._show_list_window("Shared Indicators", "Indicators found in more than one tip:", lines)
+
+    def show_tip_clusters(self):
+        lines = []
+        for number, tips in enumerate(self.store.clusters(), 1):
+            lines.append(f"Cluster {number} ({len(tips)} tips)")
+            lines.extend(f"    {os.path.basename(name)}  |  SHA-256: {tip_hash}" for tip_hash, name in tips)
+        if not lines:
+            self.status.config(text="No tips are linked by shared indicators.", fg="orange")
+            return
+        self._show_list_window("Tip Clusters", "Tips connected through shared emails, IPs, usernames, phones or hashes:",
+                               lines)
+
+    def export_ip_timeline(self):
+        if not len(self.store.timeline):
+            messagebox.showinfo("Export", "No IP events to export.")
+            return
+        network = simpledialog.askstring(
+            "IP Timeline", "Only include addresses in this network (e.g. 203.0.113.0/24).\nLeave empty for all:",
+            parent=self.root)
+        if network is None:
+            return
+        networks = [network.strip()] if network.strip() else []
+        try:
+            for cidr in networks:
+                ipaddress.IPv4Network(cidr, strict=False)
+        except ValueError as e:
+            messagebox.showerror("IP Timeline", f"Invalid network: {e}")
+            return
+        filename = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")],
+                                                title="Export IP Timeline")
+        if not filename:
+            return
+        try:
+            count = write_ip_timeline(self.store, filename, self.store.ip_events(networks=networks))
+            messagebox.showinfo("Export Complete", f"Exported {count} IP events to {filename}")
+        except Exception as e:
+            self.logger.error(f"Failed to export IP timeline: {e}")
+            messagebox.showerror("Export Error", f"An error occurred while exporting the IP timeline:\n{e}")
+
+    def export_occurrences(self):
+        if not self.store.occurrence_count():
+            messagebox.showinfo("Export", "No data to export.")
+            return
+        if self.export_thread is not None:
+            self.status.config(text="An export is already running.", fg="orange")
+            return
+        if self.ingest_thread is not None:
+            self.status.config(text="Wait for the files to finish processing before exporting.", fg="orange")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv", title="Export All Occurrences",
+            filetypes=[("CSV Files", "*.csv"), ("JSON Lines", "*.jsonl"), ("SQLite Database", "*.sqlite3")])
+        if not filename:
+            return
+        # Large cases take a while to write, so the export runs beside the Tk loop
+        self.export_result = None
+        self.export_thread = threading.Thread(target=self._export_worker, args=(filename,), daemon=True)
+        self.export_thread.start()
+        self.status.config(text=f"Exporting occurrences to {os.path.basename(filename)}...", fg="blue")
+        self.root.after(self.POLL_INTERVAL_MS, self._check_export)
+
+    def _export_worker(self, filename):
+        try:
+            self.export_result = (filename, export_occurrences(self.store, filename, logger=self.logger), None)
+        except Exception as e:
+            self.logger.error(f"Failed to export occurrences: {e}")
+            self.export_result = (filename, 0, e)
+
+    def _check_export(self):
+        if self.export_thread.is_alive():
+            self.root.after(self.POLL_INTERVAL_MS, self._check_export)
+            return
+        self.export_thread = None
+        filename, count, error = self.export_result
+        if error is not None:
+            self.status.config(text="Export failed.", fg="red")
+            messagebox.showerror("Export Error", f"An error occurred while exporting:\n{error}")
+        else:
+            self.status.config(text=f"Exported {count} occurrences to {os.path.basename(filename)}.", fg="green")
+
+    def _show_list_window(self, title, heading, lines):
+        win = tk.Toplevel(self.root)
+        win.title(title)
+        tk.Label(win, text=heading).pack(padx=10, pady=(10, 0), anchor='w')
+        listbox = tk.Listbox(win, width=110, height=min(max(len(lines), 3), 20))
+        listbox.pack(padx=10, pady=10)
+        for line in lines:
+            listbox.insert(tk.END, line)
+        tk.Button(win, text="Close", command=win.destroy).pack(pady=5)
+
+    def handle_drop(self, event):
+        # Drag-and-drop highlight
+        self.drop_area.config(bg="#b3d9ff")
+        self.root.after(150, lambda: self.drop_area.config(bg="#e0e0e0"))
+        paths = self.root.tk.splitlist(event.data)
+        files = [p for p in paths if p.lower().endswith(('.pdf', '.zip'))]
+        unsupported = [p for p in paths if not p.lower().endswith(('.pdf', '.zip'))]
+        if unsupported:
+            self.status.config(text=f"Unsupported file(s) skipped: {', '.join(os.path.basename(u) for u in unsupported)}", fg="orange")
+        if files:
+            self.load_files(files)
+        elif unsupported:
+            return
+        else:
+            self.status.config(text="No files to process.", fg="orange")
+
+    def _add_file_to_listbox(self, filename, md5_hash, sha256_hash, members=()):
+        ext = os.path.splitext(filename)[1].lower()
+        label = "[PDF]" if ext == ".pdf" else ("[ZIP]" if ext == ".zip" else "[FILE]")
+        display_str = f"{label} {os.path.basename(filename)}  |  MD5: {md5_hash}  |  SHA-256: {sha256_hash}"
+        self.file_listbox.insert(tk.END, display_str)
+        for member_name, member_md5, member_sha256 in members:
+            self.file_listbox.insert(tk.END, f"    [PDF] {member_name}  |  MD5: {member_md5}  |  SHA-256: {member_sha256}")
+
+    def load_files(self, paths):
+        if self.ingest_thread is not None:
+            self.status.config(text="Still processing files. Wait for them to finish or press Cancel.", fg="orange")
+            return
+        if self.export_thread is not None:
+            self.status.config(text="Wait for the export to finish before loading more files.", fg="orange")
+            return
+        new_files = [p for p in paths if p.lower().endswith(('.pdf', '.zip')) and p not in self.loaded_files]
+        self.progress['value'] = 0
+        self.progress['maximum'] = len(new_files) if new_files else 1
+        if not new_files:
+            self.status.config(text="No new files to process.", fg="orange")
+            return
+        self.ingest_start = time.time()
+        self.ingest_total = len(new_files)
+        self.ingest_processed = 0
+        self.ingest_errors = []
+        self.metrics = Metrics()
+        self.cancel_event = threading.Event()
+        self.ingest_generation += 1
+        self.status.config(text=f"Processing files... 0/{self.ingest_total}", fg="blue")
+        self.btn_cancel.config(state=tk.NORMAL)
+        # Parsing runs in worker processes driven by a background thread; the Tk loop only drains results
+        self.ingest_thread = threading.Thread(target=self._ingest_worker,
+                                              args=(new_files, self.cancel_event, self.ingest_generation),
+                                              daemon=True)
+        self.ingest_thread.start()
+        self.root.after(self.POLL_INTERVAL_MS, self._drain_results, self.ingest_generation)
+
+    def _ingest_worker(self, files, cancel_event, generation):
+        try:
+            workers = min(len(files), os.cpu_count() or 1)
+            # Spawn rather than fork: the GUI process holds a Tk connection and other threads
+            mp_context = multiprocessing.get_context("spawn")
+            # Reads of the next files overlap with parsing, which helps most on network shares
+            for result in IngestPipeline(files, workers, cancel_event, mp_context, cache_path=self.cache_path,
+                                         metrics=True, **pipeline_options_from_env()):
+                self.result_queue.put((generation, result))
+            cache = ResultCache(self.cache_path, logger=self.logger)
+            cache.evict()
+            cache.close()
+        except Exception as e:
+            self.logger.error(f"Background ingestion failed: {e}")
+            self.result_queue.put((generation, e))
+        finally:
+            self.result_queue.put((generation, None))
+
+    def _drain_results(self, generation):
+        if generation != self.ingest_generation:
+            return  # The job was cleared; its end marker is skipped, so this loop stops here
+        changed = False
+        finished = False
+        for _ in range(self.MAX_RESULTS_PER_POLL):
+            try:
+                result_generation, result = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+            if result_generation != generation:
+                continue  # Left over from a job that was cleared
+            if result is None:
+                finished = True
+                break
+            if isinstance(result, Exception):
+                self.ingest_errors.append(f"Background ingestion failed: {result}")
+                continue
+            self._apply_result(result)
+            changed = True
+        if changed:
+            self.refresh_display()
+            self.status.config(text=f"Processing files... {self.ingest_processed}/{self.ingest_total}", fg="blue")
+        if finished:
+            self._finish_ingest()
+        else:
+            self.root.after(self.POLL_INTERVAL_MS, self._drain_results, generation)
+
+    def _apply_result(self, result):
+        path = result.path
+        self.metrics.merge(result.metrics)
+        if result.error:
+            self.ingest_errors.append(f"{os.path.basename(path)}: {result.error}")
+            self.metrics.count('files_failed')
+        else:
+            with self.metrics.timer('merge'):
+                self.store.add_result(result)
+            self.metrics.count('files_merged')
+            self.loaded_files.add(path)
+            self._add_file_to_listbox(path, result.md5, result.sha256, result.members)
+        self.ingest_processed += 1
+        self.progress['value'] = self.ingest_processed
+
+    def _finish_ingest(self):
+        self.ingest_thread = None
+        self.btn_cancel.config(state=tk.DISABLED)
+        total_elapsed = time.time() - self.ingest_start
+        self.logger.info(f"All files processed in {total_elapsed:.2f} seconds. Total files: {len(self.loaded_files)}")
+        for key in self.store.value_text:
+            self.logger.info(f"SUMMARY: {key}: {self.store.count(key)} total items.")
+        self.logger.info(f"SUMMARY: {self.store.occurrence_count()} occurrences in {len(self.store.tip_hashes)} tip(s).")
+        try:
+            # Kept next to the log file and replaced after every load
+            self.metrics.write(os.path.join(os.getcwd(), METRICS_FILE_NAME), total_elapsed, self.logger,
+                               command="gui", files=self.ingest_processed)
+        except OSError as e:
+            self.logger.warning(f"Could not write metrics report: {e}")
+        self.progress['value'] = 0
+        cancelled = self.cancel_event.is_set()
+        if self.ingest_errors:
+            self.status.config(text="Some files could not be processed.", fg="red")
+            self.show_error_popup("Some files could not be processed:\n" + "\n".join(self.ingest_errors))
+        elif cancelled:
+            self.status.config(text=f"Cancelled. Processed {self.ingest_processed} of {self.ingest_total} file(s).", fg="orange")
+        else:
+            self.status.config(text=f"Done! Processed {self.ingest_total} file(s).", fg="green")
+
+    def cancel_ingest(self):
+        if self.ingest_thread is None:
+            return
+        self.logger.info("Cancelling background ingestion.")
+        self.cancel_event.set()
+        self.btn_cancel.config(state=tk.DISABLED)
+        self.status.config(text="Cancelling... waiting for files already in progress.", fg="orange")
+
+    def show_error_popup(self, msg):
+        # Improved error popup with copy option
+        def copy_to_clipboard():
+            self.root.clipboard_clear()
+            self.root.clipboard_append(msg)
+        err_win = tk.Toplevel(self.root)
+        err_win.title("Error Details")
+        tk.Label(err_win, text=msg, justify='left', wraplength=500).pack(padx=10, pady=10)
+        tk.Button(err_win, text="Copy Details", command=copy_to_clipboard).pack(pady=5)
+        tk.Button(err_win, text="Close", command=err_win.destroy).pack(pady=5)
+
+    def refresh_display(self):
+        # The store's value lists only grow, so each view is handed just the values it has not seen
+        for key, view in self.data_views.items():
+            values = self.store.values(key)
+            view.add(values[len(view.values):])
+        self.status.config(text=f"Loaded {len(self.loaded_files)} file(s).")
+
+    def clear_files(self):
+        if self.export_thread is not None:
+            self.status.config(text="Wait for the export to finish before clearing.", fg="orange")
+            return
+        self.logger.info("Clearing all loaded files and extracted data.")
+        if self.ingest_thread is not None:
+            # Drop whatever the running job still delivers
+            self.cancel_event.set()
+            self.ingest_generation += 1
+            self.ingest_thread = None
+            self.btn_cancel.config(state=tk.DISABLED)
+            self.progress['value'] = 0
+        self.store.clear()
+        self.loaded_files.clear()
+        self.file_listbox.delete(0, tk.END)
+        for view in self.data_views.values():
+            view.clear()
+        self.status.config(text="Cleared all data.")
+
+    def toggle_dark_mode(self):
+        self.dark_mode = not self.dark_mode
+        bg = '#222222' if self.dark_mode else '#f0f0f0'
+        fg = '#f0f0f0' if self.dark_mode else '#000000'
+        widget_bg = '#333333' if self.dark_mode else '#e0e0e0'
+        select_bg = '#444444' if self.dark_mode else '#c0c0c0'
+        self.root.configure(bg=bg)
+        self.main_frame.configure(bg=bg)
+        self.canvas.configure(bg=bg, highlightbackground=bg)
+        self.scrollable_frame.configure(bg=bg)
+        # Update all widgets in the scrollable frame
+        for widget in self.scrollable_frame.winfo_children():
+            if isinstance(widget, tk.Label):
+                widget.configure(bg=widget_bg, fg=fg)
+            elif isinstance(widget, tk.Button):
+                widget.configure(bg=bg, fg=fg, activebackground=widget_bg, activeforeground=fg)
+            elif isinstance(widget, tk.Listbox):
+                widget.configure(bg=bg, fg=fg, selectbackground=select_bg, selectforeground=fg)
+            elif isinstance(widget, ttk.Progressbar):
+                style = ttk.Style()
+                style.theme_use('default')
+                style.configure("TProgressbar", troughcolor=bg, background=select_bg, bordercolor=bg, lightcolor=bg, darkcolor=bg)
+        for view in self.data_views.values():
+            view.configure_colors(bg, fg, select_bg, widget_bg)
+        self.status.configure(bg=bg, fg=fg)
+        # Update menu colors (best effort, limited by Tkinter)
+        try:
+            self.root.option_add('*Menu.background', widget_bg)
+            self.root.option_add('*Menu.foreground', fg)
+            self.root.option_add('*Menu.activeBackground', select_bg)
+            self.root.option_add('*Menu.activeForeground', fg)
+        except Exception:
+            pass
+
+    def select_files(self):
+        file_paths = filedialog.askopenfilenames(filetypes=[("Supported Files", "*.pdf *.zip")])
+        unsupported = [p for p in file_paths if not p.lower().endswith(('.pdf', '.zip'))]
+        if unsupported:
+            self.status.config(text=f"Unsupported file(s) skipped: {', '.join(os.path.basename(u) for u in unsupported)}", fg="orange")
+        files = [p for p in file_paths if p.lower().endswith(('.pdf', '.zip'))]
+        if files:
+            self.load_files(files)
+        elif unsupported:
+            return
+        else:
+            self.status.config(text="No files to process.", fg="orange")
+
+    def select_folder(self):
+        folder_path = filedialog.askdirectory(title="Select Folder Containing PDF/ZIP Files")
+        if not folder_path:
+            return
+        files = [os.path.join(folder_path, f) for f in os.listdir(folder_path)
+                 if f.lower().endswith(('.pdf', '.zip'))]
+        if not files:
+            self.status.config(text="No PDF or ZIP files found in selected folder.", fg="orange")
+            return
+        self.load_files(files)
+        self.logger.info(f"Loaded {len(files)} file(s) from folder: {folder_path}")
+
+def run():
+    root = TkinterDnD.Tk()
+    app = CyberTipExtractorApp(root)
+    root.mainloop()
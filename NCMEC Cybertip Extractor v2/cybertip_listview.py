@@ -0,0 +1,161 @@
+import tkinter as tk
+from tkinter import ttk
+from bisect import bisect_left
+
+from cybertip_store import SortedValues
+
+
+class VirtualListView:
+    # A filterable list of any length drawn through a small Tk Listbox. The Listbox only ever
+    # holds the rows that are on screen; scrolling re-renders those rows from the sorted
+    # values, so redraw cost depends on the height of the box, not on the number of items.
+    FILTER_DELAY_MS = 150
+
+    def __init__(self, parent, sort_key=None, width=40, height=6):
+        self.values = SortedValues(sort_key)
+        self.shown = self.values.items
+        self.top = 0
+        self.height = height
+        self.selected = None
+        self.filter_job = None
+        self.frame = tk.Frame(parent)
+        self.filter_var = tk.StringVar()
+        self.filter_entry = tk.Entry(self.frame, textvariable=self.filter_var, width=width)
+        self.filter_entry.grid(row=0, column=0, columnspan=2, sticky='we')
+        self.listbox = tk.Listbox(self.frame, width=width, height=height, exportselection=False)
+        self.listbox.grid(row=1, column=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scroll)
+        self.scrollbar.grid(row=1, column=1, sticky='ns')
+        self.count_label = tk.Label(self.frame, text="0 items", anchor='w')
+        self.count_label.grid(row=2, column=0, columnspan=2, sticky='we')
+        self.filter_var.trace_add('write', self.on_filter_change)
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.bind("<MouseWheel>", self.on_wheel)
+        self.listbox.bind("<Button-4>", lambda event: self.scroll_to(self.top - 1))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll_to(self.top + 1))
+        self.listbox.bind("<Up>", lambda event: self.move_selection(-1))
+        self.listbox.bind("<Down>", lambda event: self.move_selection(1))
+        self.listbox.bind("<Prior>", lambda event: self.scroll_to(self.top - self.height))
+        self.listbox.bind("<Next>", lambda event: self.scroll_to(self.top + self.height))
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def bind(self, sequence, callback):
+        self.listbox.bind(sequence, callback)
+
+    def add(self, values):
+        # Merges new values in place; only the visible rows are redrawn
+        if not values:
+            return
+        self.values.add(values)
+        self.refilter(keep_position=True)
+
+    def clear(self):
+        self.values.clear()
+        self.filter_var.set("")
+        self.refilter()
+
+    def all_items(self):
+        return self.values.items
+
+    def get_selected(self):
+        return self.selected
+
+    def refilter(self, keep_position=False):
+        self.shown = self.values.search(self.filter_var.get().strip())
+        if self.selected is not None:
+            position = self._position(self.selected)
+            if position >= len(self.shown) or self.shown[position] != self.selected:
+                self.selected = None
+        if not keep_position:
+            self.top = 0
+        self.render()
+
+    def on_filter_change(self, *args):
+        # Waits for a pause in typing before searching
+        if self.filter_job is not None:
+            self.frame.after_cancel(self.filter_job)
+        self.filter_job = self.frame.after(self.FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self.filter_job = None
+        self.refilter()
+
+    def render(self):
+        total = len(self.shown)
+        self.top = max(0, min(self.top, total - self.height))
+        rows = self.shown[self.top:self.top + self.height]
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *rows)
+        if self.selected in rows:
+            self.listbox.selection_set(rows.index(self.selected))
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        query = self.filter_var.get().strip()
+        if query:
+            self.count_label.config(text=f"{total} of {len(self.values)} items match")
+        else:
+            self.count_label.config(text=f"{total} items")
+
+    def scroll_to(self, top):
+        self.top = top
+        self.render()
+        return "break"
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.shown)))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self.scroll_to(self.top + int(amount) * step)
+
+    def on_wheel(self, event):
+        return self.scroll_to(self.top - (1 if event.delta > 0 else -1) * 3)
+
+    def on_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.selected = self.listbox.get(selection[0])
+
+    def move_selection(self, step):
+        if not self.shown:
+            return "break"
+        index = self._position(self.selected) + step if self.selected is not None else self.top
+        index = max(0, min(index, len(self.shown) - 1))
+        self.selected = self.shown[index]
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.height:
+            self.top = index - self.height + 1
+        self.render()
+        return "break"
+
+    def _position(self, value):
+        # Row of value in the shown list (or where it would be), found by bisection
+        key = self.values.sort_key
+        if key is None:
+            return bisect_left(self.shown, value)
+        return bisect_left(_SortKeys(self.shown, key), key(value))
+
+    def configure_colors(self, bg, fg, select_bg, widget_bg):
+        self.frame.configure(bg=bg)
+        self.listbox.configure(bg=bg, fg=fg, selectbackground=select_bg, selectforeground=fg)
+        self.filter_entry.configure(bg=widget_bg, fg=fg, insertbackground=fg)
+        self.count_label.configure(bg=bg, fg=fg)
+
+
+class _SortKeys:
+    # The sort keys of a sorted list, computed as bisect asks for them (its key argument
+    # needs Python 3.10)
+    def __init__(self, items, key):
+        self.items = items
+        self.key = key
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.key(self.items[index])
@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+METRICS_FILE_NAME = "cybertip_metrics.json"
+LOG_LEVEL_ENV = "CYBERTIP_LOG_LEVEL"
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+DEFAULT_LOG_LEVEL = "INFO"
+
+
+def log_level():
+    # Read from the environment so worker processes (forked or spawned) use the same level
+    level = os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL).upper()
+    return level if level in LOG_LEVELS else DEFAULT_LOG_LEVEL
+
+
+def set_log_level(level):
+    os.environ[LOG_LEVEL_ENV] = level.upper()
+    logging.getLogger().setLevel(log_level())
+
+
+class Metrics:
+    # Stage timers (seconds) and counters for one file or one whole run. Disabled metrics
+    # record nothing; the parser checks `enabled` once per page or section, so the only cost
+    # left on the hot path is that attribute lookup.
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.timers = defaultdict(float)
+        self.counters = defaultdict(int)
+
+    def __bool__(self):
+        return self.enabled
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def add_time(self, name, seconds):
+        if self.enabled:
+            self.timers[name] += seconds
+
+    def timer(self, name):
+        return _Timer(self, name) if self.enabled else _NO_TIMER
+
+    def merge(self, snapshot):
+        # Adds a snapshot() taken elsewhere, e.g. in a pool worker
+        if not self.enabled or not snapshot:
+            return
+        for name, seconds in snapshot['timers'].items():
+            self.timers[name] += seconds
+        for name, amount in snapshot['counters'].items():
+            self.counters[name] += amount
+
+    def snapshot(self):
+        if not self.enabled:
+            return None
+        return {'timers': dict(self.timers), 'counters': dict(self.counters)}
+
+    def report(self, elapsed, **extra):
+        # Timers from pool workers are summed over all workers, so they can add up to more
+        # than the wall-clock time of the run
+        timers = {name: round(seconds, 6) for name, seconds in sorted(self.timers.items())}
+        counters = dict(sorted(self.counters.items()))
+        rates = {}
+        for rate, (counter, timer, scale) in RATES.items():
+            if counters.get(counter) and self.timers.get(timer):
+                rates[rate] = round(counters[counter] / scale / self.timers[timer], 3)
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'elapsed_s': round(elapsed, 6),
+            'timers_s': timers,
+            'counters': counters,
+            'rates': rates,
+        }
+        report.update(extra)
+        return report
+
+    def write(self, filename, elapsed, logger=None, **extra):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.report(elapsed, **extra), f, indent=2)
+        (logger or logging.getLogger("CyberTipLogger")).info(f"Wrote metrics report to {filename}")
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.metrics.timers[self.name] += time.perf_counter() - self.start
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_TIMER = _NoTimer()
+
+# Throughput figures derived for the report: name -> (counter, timer, unit size)
+RATES = {
+    'hash_mb_per_s': ('bytes_read', 'hash', 1024 * 1024),
+    'fitz_pages_per_s': ('pages_read', 'fitz_text', 1),
+    'scan_mchars_per_s': ('section_chars', 'scan', 1000 * 1000),
+    'files_per_s_merge': ('files_merged', 'merge', 1),
+}
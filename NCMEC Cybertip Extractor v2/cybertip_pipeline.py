@@ -0,0 +1,259 @@
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cybertip_core import parse_file, setup_logging
+
+# Files read at the same time; reads mostly wait on the disk or the network, so a few in
+# parallel hide the latency of a remote evidence share
+DEFAULT_READERS = 4
+# Files read ahead of the parsers
+DEFAULT_READ_AHEAD = 16
+# Memory the read-ahead files may take together
+DEFAULT_BUFFER_MB = 256
+# Bigger files are not read ahead; their worker maps them from disk itself
+PREFETCH_MAX_MB = 64
+# Finished results waiting for the merger
+DEFAULT_RESULT_DEPTH = 32
+# How often a running pipeline looks at its cancel event
+CANCEL_POLL_SECONDS = 0.05
+# Environment variables for the settings above, so the app (which has no command line) can be tuned too
+PIPELINE_ENV = {
+    'readers': ("CYBERTIP_READERS", int),
+    'read_ahead': ("CYBERTIP_READ_AHEAD", int),
+    'buffer_mb': ("CYBERTIP_READ_BUFFER_MB", float),
+    'parse_depth': ("CYBERTIP_PARSE_DEPTH", int),
+    'result_depth': ("CYBERTIP_RESULT_DEPTH", int),
+}
+
+_DONE = object()
+
+
+def pipeline_options_from_env():
+    # IngestPipeline keyword arguments set in the environment; unset or invalid values keep the defaults
+    options = {}
+    for option, (name, kind) in PIPELINE_ENV.items():
+        try:
+            options[option] = kind(os.environ[name])
+        except (KeyError, ValueError):
+            continue
+    return options
+
+
+class _ByteBudget:
+    # Caps the bytes held by read-ahead files; a file bigger than the whole budget still gets
+    # through on its own so the pipeline cannot stall
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self, size):
+        size = min(size, self.limit)
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.used == 0 or self.used + size <= self.limit)
+            self.used += size
+
+    async def release(self, size):
+        async with self.condition:
+            self.used -= min(size, self.limit)
+            self.condition.notify_all()
+
+
+class IngestPipeline:
+    # Staged ingestion: reads -> bounded queue -> parse workers -> bounded queue -> one merger.
+    # An asyncio loop in a background thread drives the readers (blocking reads run in a small
+    # thread pool) and hands the bytes to the parse workers, so while the workers hash, extract
+    # text and scan one batch of files, the next batch is already being read. Every stage is
+    # bounded, so a slow merger stops the parsers and full parsers stop the readers, and the
+    # memory held stays within the configured depths.
+    # Iterating yields FileResults in completion order. Setting cancel_event drops the files still
+    # waiting in the read-ahead queue and the worker pool; files already being parsed still finish.
+    # If a worker process dies, iteration raises BrokenProcessPool instead of waiting forever.
+    def __init__(self, files, workers, cancel_event=None, mp_context=None, selective=True, cache_path=None,
+                 metrics=False, readers=DEFAULT_READERS, read_ahead=DEFAULT_READ_AHEAD, buffer_mb=DEFAULT_BUFFER_MB,
+                 result_depth=DEFAULT_RESULT_DEPTH, parse_depth=None):
+        self.files = list(files)
+        self.workers = max(1, workers)
+        self.cancel_event = cancel_event
+        self.mp_context = mp_context
+        self.selective = selective
+        self.cache_path = cache_path
+        self.metrics = metrics
+        self.readers = max(1, readers)
+        self.read_ahead = max(1, read_ahead)
+        self.buffer_bytes = int(buffer_mb * 1024 * 1024)
+        # Files handed to the workers at once; one extra per worker keeps them busy while a
+        # finished result travels back
+        self.parse_depth = max(1, parse_depth or self.workers * 2)
+        self.results = queue.Queue(maxsize=max(1, result_depth))
+        self.stopping = threading.Event()
+        self.logger = logging.getLogger("CyberTipLogger")
+        # Seconds spent reading, waiting for room to read ahead (parsing is the bottleneck),
+        # and waiting for something to parse (reading is the bottleneck)
+        self.stats = {'read_s': 0.0, 'read_bytes': 0, 'reader_wait_s': 0.0, 'parser_wait_s': 0.0}
+
+    def __iter__(self):
+        thread = threading.Thread(target=self._run_loop, name="cybertip-pipeline", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = self.results.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Reached early when the consumer stops iterating; let in-flight files finish and drop them
+            self.stopping.set()
+            while thread.is_alive():
+                try:
+                    self.results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            thread.join()
+            self.logger.info(f"Pipeline: read {self.stats['read_bytes']} bytes in {self.stats['read_s']:.2f} s; "
+                             f"readers waited {self.stats['reader_wait_s']:.2f} s for the parsers, parsers "
+                             f"waited {self.stats['parser_wait_s']:.2f} s for the readers")
+
+    def _run_loop(self):
+        try:
+            asyncio.run(self._run())
+        except BaseException as e:
+            self._hand_off(e)
+        finally:
+            self._hand_off(_DONE, force=True)
+
+    def _hand_off(self, item, force=False):
+        # Blocks while the merger is behind (backpressure), unless the consumer has gone away
+        while True:
+            if self.stopping.is_set() and not force:
+                return
+            try:
+                self.results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self.stopping.is_set():
+                    return
+
+    def _stopped(self):
+        return self.stopping.is_set() or (self.cancel_event is not None and self.cancel_event.is_set())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        read_queue = asyncio.Queue(self.read_ahead)
+        budget = _ByteBudget(self.buffer_bytes)
+        pending = iter(self.files)
+        io_threads = ThreadPoolExecutor(self.readers, thread_name_prefix="cybertip-read")
+        handoff = ThreadPoolExecutor(1, thread_name_prefix="cybertip-handoff")
+        if self.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            workers = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context,
+                                          initializer=setup_logging)
+        else:
+            # One worker still overlaps with the reads when it runs in a thread
+            workers = ThreadPoolExecutor(1, thread_name_prefix="cybertip-parse")
+
+        # Files handed to the workers and not finished yet, so a cancel can withdraw the ones not started
+        submitted = set()
+
+        async def reader():
+            for path in pending:
+                if self._stopped():
+                    return
+                size = await loop.run_in_executor(io_threads, _file_size, path)
+                prefetch = 0 < size <= PREFETCH_MAX_MB * 1024 * 1024
+                waited = time.perf_counter()
+                if prefetch:
+                    await budget.acquire(size)
+                self.stats['reader_wait_s'] += time.perf_counter() - waited
+                data = None
+                if prefetch:
+                    start = time.perf_counter()
+                    data = await loop.run_in_executor(io_threads, _read_file, path)
+                    self.stats['read_s'] += time.perf_counter() - start
+                    self.stats['read_bytes'] += len(data) if data is not None else 0
+                waited = time.perf_counter()
+                await read_queue.put((path, data, size if prefetch else 0))
+                self.stats['reader_wait_s'] += time.perf_counter() - waited
+
+        async def parser():
+            while True:
+                waited = time.perf_counter()
+                item = await read_queue.get()
+                self.stats['parser_wait_s'] += time.perf_counter() - waited
+                if item is None:
+                    return
+                path, data, reserved = item
+                try:
+                    # Files still queued after a cancel are dropped without being parsed
+                    if self._stopped():
+                        continue
+                    # A file that could not be read ahead (data None) is read by the worker,
+                    # which also reports any error
+                    future = workers.submit(parse_file, path, self.selective, self.cache_path, self.metrics, data)
+                    submitted.add(future)
+                    try:
+                        result = await asyncio.wrap_future(future)
+                    except asyncio.CancelledError:
+                        if not future.cancelled():
+                            raise
+                        continue
+                    finally:
+                        submitted.discard(future)
+                finally:
+                    data = None
+                    await budget.release(reserved)
+                await loop.run_in_executor(handoff, self._hand_off, result)
+
+        async def watch_cancel():
+            while not self._stopped():
+                await asyncio.sleep(CANCEL_POLL_SECONDS)
+            # Only files a worker has not started yet can be withdrawn
+            for future in list(submitted):
+                future.cancel()
+
+        async def feed():
+            await asyncio.gather(*(reader() for _ in range(self.readers)))
+            for _ in range(self.parse_depth):
+                await read_queue.put(None)
+
+        canceller = asyncio.create_task(watch_cancel())
+        try:
+            tasks = {asyncio.create_task(feed())} | {asyncio.create_task(parser()) for _ in range(self.parse_depth)}
+            # A failure in any stage (e.g. BrokenProcessPool when a worker is killed by a crash or
+            # the OOM killer) stops the others, which would otherwise wait on each other's queues
+            # forever, and is raised to the consumer
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+                failed = [task for task in done if not task.cancelled() and task.exception() is not None]
+                if failed:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise failed[0].exception()
+        finally:
+            canceller.cancel()
+            workers.shutdown(cancel_futures=True)
+            io_threads.shutdown()
+            handoff.shutdown()
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _read_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
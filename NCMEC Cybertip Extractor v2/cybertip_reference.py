@@ -0,0 +1,74 @@
+import re
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+# The extraction rules of the original single-window app, kept verbatim as the oracle that
+# scan_section is checked against ("selfcheck" and the tests). Normal runs never import this.
+
+
+class ReferenceParser:
+    # Patterns and parse_section exactly as they were in CyberTipExtractorApp
+    EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+    # Improved phone pattern: require word boundaries and avoid matching inside hashes or IDs
+    PHONE_PATTERN = re.compile(r"(?<![\w\d])(?:\+1[-.\s]?)?(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})(?![\w\d])")
+    HASH_PATTERN = re.compile(r"\b[a-fA-F0-9]{32}\b")
+    IP_TIME_PATTERN = re.compile(r"IP Address[:\s]*([\d.]+).*?(\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2} UTC)", re.DOTALL)
+    TABLE_IP_PATTERN = re.compile(r"IP Address\s+([\d.]+)\s+Upload\s+(\d{2}-\d{4} \d{2}:\d{2}:\d{2} UTC)")
+    USERNAME_PATTERNS = [re.compile(fr"{key}\s*(\S+)") for key in ["Screen/User Name:", "Display Name:", "ESP User ID:"]]
+
+    def __init__(self, logger=None):
+        self.data = defaultdict(set)
+        self.logger = logger or logging.getLogger("CyberTipLogger")
+
+    def parse_section(self, section_text):
+        hashes = self.HASH_PATTERN.findall(section_text)
+        self.data['hashes'].update(hashes)
+        md5_set = set(hashes)
+        ip_time_matches = self.IP_TIME_PATTERN.findall(section_text)
+        for ip, timestamp in ip_time_matches:
+            try:
+                dt = datetime.strptime(timestamp, "%m-%d-%Y %H:%M:%S UTC")
+                ts_clean = dt.strftime("%Y-%m-%d %H:%M:%S")
+                self.data['ips'].add(f"{ip} → {ts_clean}")
+            except Exception:
+                continue
+        table_matches = self.TABLE_IP_PATTERN.findall(section_text)
+        for ip, timestamp in table_matches:
+            try:
+                dt = datetime.strptime(timestamp, "%m-%d-%Y %H:%M:%S UTC")
+                ts_clean = dt.strftime("%Y-%m-%d %H:%M:%S")
+                self.data['ips'].add(f"{ip} → {ts_clean}")
+            except Exception:
+                continue
+        # Enhanced email extraction with logging
+        email_matches = list(self.EMAIL_PATTERN.findall(section_text))
+        for email in email_matches:
+            if not any(domain in email.lower() for domain in [".gov", "@ncmec.org", "@ilag.gov"]):
+                self.data['emails'].add(email)
+                self.logger.debug(f"Extracted email: {email}")
+        if not self.data['emails']:
+            self.logger.debug(f"No emails found in section: {section_text[:100]}...")
+        # Enhanced phone extraction with logging
+        phone_matches = list(self.PHONE_PATTERN.finditer(section_text))
+        for match in phone_matches:
+            phone = match.group(1)
+            digits_only = re.sub(r"\D", "", phone)
+            if digits_only not in {"2177829030", "8774462632"} and not any(digits_only in h for h in md5_set):
+                self.data['phones'].add(phone)
+                self.logger.debug(f"Extracted phone: {phone}")
+        if not self.data['phones']:
+            self.logger.debug(f"No phones found in section: {section_text[:100]}...")
+        patterns = ["Screen/User Name:", "Display Name:", "ESP User ID:"]
+        for key in patterns:
+            usernames = re.findall(fr"{key}\s*(\S+)", section_text)
+            self.data['usernames'].update(usernames)
+            for username in usernames:
+                self.logger.debug(f"Extracted username: {username}")
+
+
+def reference_scan_section(section_text):
+    # Indicators of one section as {field: set of values}, the way the original app found them
+    parser = ReferenceParser()
+    parser.parse_section(section_text)
+    return dict(parser.data)
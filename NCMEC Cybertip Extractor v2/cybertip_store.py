@@ -0,0 +1,445 @@
+import os
+import csv
+import heapq
+import logging
+import calendar
+import ipaddress
+from array import array
+from bisect import bisect_left, bisect_right
+
+from cybertip_core import DATA_FIELDS
+
+
+class IndicatorStore:
+    # Keeps every extracted indicator exactly once and records where it was found.
+    # Values are dictionary-encoded per field (value -> id, id -> value), and each occurrence
+    # is one row across parallel typed arrays instead of a tuple of Python objects, so
+    # millions of occurrences cost a few bytes each.
+    SECTIONS = ("", "A", "B", "C", "D")
+    # Fields that link tips together; every tip names its platform, so platforms would join them all
+    CORRELATION_FIELDS = ('emails', 'ips', 'usernames', 'phones', 'hashes')
+
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger("CyberTipLogger")
+        self.clear()
+
+    def clear(self):
+        self.value_ids = {field: {} for field in DATA_FIELDS}
+        self.value_text = {field: [] for field in DATA_FIELDS}
+        self.tip_ids = {}
+        self.tip_hashes = []
+        self.tip_names = []
+        # Occurrence columns: field, value id, tip id, section, page (1-based; 0 when unknown)
+        self.occ_field = array('B')
+        self.occ_value = array('I')
+        self.occ_tip = array('I')
+        self.occ_section = array('B')
+        self.occ_page = array('I')
+        # Occurrence rows of each value, by field and value id. Posting lists hold a plain int
+        # until they get a second entry, since most indicators appear only once.
+        self.value_rows = {field: [] for field in DATA_FIELDS}
+        # Inverted index: correlation key (an IP address without its timestamp, otherwise the
+        # value itself) -> ids of the tips that contain it, in ingestion order
+        self.key_ids = {field: {} for field in DATA_FIELDS}
+        self.key_text = {field: [] for field in DATA_FIELDS}
+        self.key_tips = {field: [] for field in DATA_FIELDS}
+        self.timeline = IpTimeline()
+
+    def add_value(self, field, value):
+        ids = self.value_ids[field]
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(self.value_text[field])
+            self.value_text[field].append(value)
+            self.value_rows[field].append(None)
+        return value_id
+
+    def correlation_key(self, field, value):
+        return value.split(" → ", 1)[0] if field == 'ips' else value
+
+    def add_key(self, field, key):
+        ids = self.key_ids[field]
+        key_id = ids.get(key)
+        if key_id is None:
+            key_id = ids[key] = len(self.key_text[field])
+            self.key_text[field].append(key)
+            self.key_tips[field].append(None)
+        return key_id
+
+    def add_tip(self, tip_hash, name):
+        tip_id = self.tip_ids.get(tip_hash)
+        if tip_id is None:
+            tip_id = self.tip_ids[tip_hash] = len(self.tip_hashes)
+            self.tip_hashes.append(tip_hash)
+            self.tip_names.append(name)
+        return tip_id
+
+    def add(self, tip_hash, field, value, section, page):
+        value_id = self.add_value(field, value)
+        tip_id = self.tip_ids[tip_hash]
+        _post(self.value_rows[field], value_id, len(self.occ_value))
+        if field == 'ips':
+            self.timeline.add(len(self.occ_value), value)
+        self.occ_field.append(DATA_FIELDS.index(field))
+        self.occ_value.append(value_id)
+        self.occ_tip.append(tip_id)
+        self.occ_section.append(self.SECTIONS.index(section))
+        self.occ_page.append(page)
+        key_tips = self.key_tips[field]
+        key_id = self.add_key(field, self.correlation_key(field, value))
+        # Tip ids only grow and a tip's occurrences arrive together, so checking the last id dedupes
+        if _last(key_tips[key_id]) != tip_id:
+            _post(key_tips, key_id, tip_id)
+
+    def add_result(self, result):
+        # A tip whose content hash is already stored is a duplicate (renamed copy, or the same
+        # PDF inside another ZIP), so only its first occurrences are kept
+        known = {occurrence[0] for occurrence in result.occurrences if occurrence[0] in self.tip_ids}
+        names = {result.sha256: result.path}
+        for member_name, _, sha256_hash in result.members:
+            names.setdefault(sha256_hash, f"{result.path}/{member_name}")
+        for field, values in result.data.items():
+            for value in values:
+                self.add_value(field, value)
+        added = 0
+        for tip_hash, field, value, section, page in result.occurrences:
+            if tip_hash in known:
+                continue
+            if tip_hash not in self.tip_ids:
+                self.add_tip(tip_hash, names.get(tip_hash, result.path))
+            self.add(tip_hash, field, value, section, page)
+            added += 1
+        return added
+
+    def values(self, field):
+        return self.value_text[field]
+
+    def count(self, field):
+        return len(self.value_text[field])
+
+    def occurrence_count(self):
+        return len(self.occ_value)
+
+    def to_data(self):
+        return {field: self.value_text[field] for field in DATA_FIELDS}
+
+    def occurrences(self, field, value):
+        # (tip sha256, tip name, section, page) for every place the value was found
+        value_id = self.value_ids[field].get(value)
+        if value_id is None:
+            return []
+        found = []
+        for row in _entries(self.value_rows[field][value_id]):
+            tip_id = self.occ_tip[row]
+            found.append((self.tip_hashes[tip_id], self.tip_names[tip_id],
+                          self.SECTIONS[self.occ_section[row]], self.occ_page[row]))
+        return found
+
+    def occurrence_rows(self, field, value_id):
+        return _entries(self.value_rows[field][value_id])
+
+    def tips_containing(self, field, value):
+        # (tip sha256, tip name) for every tip containing the indicator; IPs match on the address
+        # alone, so "1.2.3.4" and "1.2.3.4 → <any time>" both find every tip that logged it
+        key_id = self.key_ids[field].get(self.correlation_key(field, value))
+        if key_id is None:
+            return []
+        return [(self.tip_hashes[tip_id], self.tip_names[tip_id])
+                for tip_id in _entries(self.key_tips[field][key_id])]
+
+    def ip_events(self, start=None, end=None, networks=()):
+        # Ids of the IP events between start and end (epoch seconds, inclusive) whose address is
+        # in any of the given networks, oldest first
+        return self.timeline.query(start, end, networks)
+
+    def ip_event(self, event_id):
+        # (timestamp, IP address, tip sha256, tip name, section, page) of one IP event
+        row = self.timeline.rows[event_id]
+        address, _, timestamp = self.value_text['ips'][self.occ_value[row]].partition(" → ")
+        tip_id = self.occ_tip[row]
+        return (timestamp, address, self.tip_hashes[tip_id], self.tip_names[tip_id],
+                self.SECTIONS[self.occ_section[row]], self.occ_page[row])
+
+    def find_indicator(self, value):
+        # Fields in which a value (or IP address) occurs, for queries that do not name a field
+        return [field for field in DATA_FIELDS if self.correlation_key(field, value) in self.key_ids[field]]
+
+    def shared_indicators(self, fields=None, min_tips=2, limit=50):
+        # (field, indicator, number of tips) for the indicators found in the most tips
+        candidates = ((len(tips), field, key_id)
+                      for field in fields or self.CORRELATION_FIELDS
+                      for key_id, tips in enumerate(self.key_tips[field])
+                      if type(tips) is array and len(tips) >= min_tips)
+        top = heapq.nlargest(limit, candidates) if limit else sorted(candidates, reverse=True)
+        return [(field, self.key_text[field][key_id], count) for count, field, key_id in top]
+
+    def clusters(self, fields=None, min_size=2, max_tips=None):
+        # Groups of tips connected through shared indicators (directly or via other tips), largest
+        # first. Indicators found in more than max_tips tips are ignored so one ubiquitous value
+        # does not merge unrelated tips.
+        parent = list(range(len(self.tip_hashes)))
+
+        def find(tip_id):
+            while parent[tip_id] != tip_id:
+                parent[tip_id] = parent[parent[tip_id]]
+                tip_id = parent[tip_id]
+            return tip_id
+
+        for field in fields or self.CORRELATION_FIELDS:
+            for tips in self.key_tips[field]:
+                if type(tips) is not array or (max_tips and len(tips) > max_tips):
+                    continue
+                root = find(tips[0])
+                for tip_id in tips[1:]:
+                    other = find(tip_id)
+                    if other != root:
+                        parent[other] = root
+        groups = {}
+        for tip_id in range(len(parent)):
+            groups.setdefault(find(tip_id), []).append(tip_id)
+        found = [tips for tips in groups.values() if len(tips) >= min_size]
+        found.sort(key=len, reverse=True)
+        return [[(self.tip_hashes[tip_id], self.tip_names[tip_id]) for tip_id in tips] for tips in found]
+
+
+class SortedValues:
+    # The values of one field kept in display order as they arrive, plus a trigram index
+    # for substring filtering. New values are merged into place rather than re-sorting the
+    # whole list, and the index grows with them so the first filter does not stall.
+    GRAM = 3
+    # Up to this many new values are inserted one by one; larger batches are merged in one pass
+    INSERT_LIMIT = 32
+
+    def __init__(self, sort_key=None):
+        self.sort_key = sort_key
+        self.clear()
+
+    def clear(self):
+        self.items = []
+        # Sort keys of items, computed once, so bisect needs no key argument (Python 3.10+)
+        self.keys = []
+        # Insertion order; trigram postings refer to positions in this list
+        self.arrival = []
+        self.grams = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, values):
+        key = self.sort_key
+        new = sorted(values, key=key)
+        if not new:
+            return
+        new_keys = [key(value) for value in new] if key else new
+        positions = [bisect_right(self.keys, value_key) for value_key in new_keys]
+        if len(new) <= self.INSERT_LIMIT:
+            for offset, (position, value, value_key) in enumerate(zip(positions, new, new_keys)):
+                self.items.insert(position + offset, value)
+                self.keys.insert(position + offset, value_key)
+        else:
+            self.items = _merge_at(self.items, positions, new)
+            self.keys = _merge_at(self.keys, positions, new_keys)
+        first = len(self.arrival)
+        self.arrival.extend(new)
+        self._index(first)
+
+    def _index(self, first):
+        grams = self.grams
+        size = self.GRAM
+        for item_id in range(first, len(self.arrival)):
+            text = self.arrival[item_id].lower()
+            for gram in {text[i:i + size] for i in range(len(text) - size + 1)}:
+                posting = grams.get(gram)
+                if posting is None:
+                    grams[gram] = array('I', (item_id,))
+                else:
+                    posting.append(item_id)
+
+    def search(self, text):
+        # Values containing text (case-insensitive), in display order
+        query = text.lower()
+        if not query:
+            return self.items
+        size = self.GRAM
+        if len(query) < size:
+            # Too short for the trigram index; such queries match most values anyway
+            return [value for value in self.items if query in value.lower()]
+        # Only the rarest trigram's values are candidates; checking each one directly is cheaper
+        # than intersecting posting lists that may cover most of the field
+        rarest = None
+        for gram in {query[i:i + size] for i in range(len(query) - size + 1)}:
+            posting = self.grams.get(gram)
+            if posting is None:
+                return []
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        arrival = self.arrival
+        matches = [arrival[item_id] for item_id in rarest if query in arrival[item_id].lower()]
+        return sorted(matches, key=self.sort_key)
+
+
+def _merge_at(items, positions, new):
+    # items with each new value inserted before the item at its (ascending) position
+    merged = []
+    start = 0
+    for position, value in zip(positions, new):
+        merged.extend(items[start:position])
+        merged.append(value)
+        start = position
+    merged.extend(items[start:])
+    return merged
+
+
+class IpTimeline:
+    # IP events as typed columns: the IPv4 address as an integer and the timestamp as UTC epoch
+    # seconds, plus the occurrence row they came from. Two permutations keep the events sorted
+    # by time and by address; events that arrived since the last query are merged into them
+    # then, so time-window and CIDR queries are a bisection and a slice.
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.rows = array('I')
+        self.ips = array('I')
+        self.times = array('q')
+        self.by_time = array('I')
+        self.sorted_times = array('q')
+        self.by_ip = array('I')
+        self.sorted_ips = array('I')
+        # IP strings the parser accepted that are not valid IPv4 addresses
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, row, value):
+        event = parse_ip_event(value)
+        if event is None:
+            self.skipped += 1
+            return
+        self.rows.append(row)
+        self.ips.append(event[0])
+        self.times.append(event[1])
+
+    def _sync_times(self):
+        if len(self.by_time) < len(self.rows):
+            self.by_time, self.sorted_times = _merge_index(self.by_time, self.sorted_times,
+                                                           len(self.by_time), self.times)
+
+    def _sync_ips(self):
+        # Only built once a CIDR query needs it
+        if len(self.by_ip) < len(self.rows):
+            self.by_ip, self.sorted_ips = _merge_index(self.by_ip, self.sorted_ips, len(self.by_ip), self.ips)
+
+    def window(self, start=None, end=None):
+        self._sync_times()
+        low = 0 if start is None else bisect_left(self.sorted_times, start)
+        high = len(self.sorted_times) if end is None else bisect_right(self.sorted_times, end)
+        return self.by_time[low:high]
+
+    def in_network(self, network):
+        # Event ids for addresses inside a CIDR block such as "203.0.113.0/24", by address
+        low, high = self._network_slice(network)
+        return self.by_ip[low:high]
+
+    def _network_slice(self, network):
+        self._sync_ips()
+        network = ipaddress.IPv4Network(network, strict=False)
+        return (bisect_left(self.sorted_ips, int(network.network_address)),
+                bisect_right(self.sorted_ips, int(network.broadcast_address)))
+
+    def query(self, start=None, end=None, networks=()):
+        window = self.window(start, end)
+        if not networks:
+            return window
+        slices = [self._network_slice(network) for network in networks]
+        # Filter whichever side of the query matched fewer events
+        if len(window) <= sum(high - low for low, high in slices):
+            ranges = [(self.sorted_ips[low], self.sorted_ips[high - 1]) for low, high in slices if high > low]
+            ips = self.ips
+            return array('I', (event_id for event_id in window
+                               if any(first <= ips[event_id] <= last for first, last in ranges)))
+        times = self.times
+        ids = set()
+        for low, high in slices:
+            ids.update(self.by_ip[low:high])
+        if start is not None or end is not None:
+            first = times[window[0]] if window else 0
+            last = times[window[-1]] if window else -1
+            ids = {event_id for event_id in ids if first <= times[event_id] <= last}
+        return array('I', sorted(ids, key=lambda event_id: (times[event_id], event_id)))
+
+
+def parse_ip_event(value):
+    # "1.2.3.4 → 2024-01-02 03:04:05" -> (address as int, UTC epoch seconds), or None
+    address, _, timestamp = value.partition(" → ")
+    try:
+        ip = int(ipaddress.IPv4Address(address.rstrip(".")))
+        epoch = calendar.timegm((int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+                                 int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:19])))
+    except ValueError:
+        return None
+    return ip, epoch
+
+
+def _merge_index(ids, keys, first, column):
+    # Adds events first.. of column to a permutation (ids) sorted by column (keys). Ties stay
+    # in arrival order. A batch that is large next to the index is cheaper to sort outright.
+    total = len(column)
+    if total - first > len(ids) // 8:
+        ordered = sorted(range(total), key=column.__getitem__)
+        return array('I', ordered), array(keys.typecode, [column[i] for i in ordered])
+    new = sorted(range(first, total), key=column.__getitem__)
+    merged_ids = array('I')
+    merged_keys = array(keys.typecode)
+    start = 0
+    for event_id in new:
+        key = column[event_id]
+        position = bisect_right(keys, key, start)
+        merged_ids.extend(ids[start:position])
+        merged_keys.extend(keys[start:position])
+        merged_ids.append(event_id)
+        merged_keys.append(key)
+        start = position
+    merged_ids.extend(ids[start:])
+    merged_keys.extend(keys[start:])
+    return merged_ids, merged_keys
+
+
+def write_ip_timeline(store, filename, events=None, append=False):
+    # Every IP event from every loaded tip in one chronological CSV; with append, the given
+    # events are added to the end of an earlier export in the order given
+    events = store.ip_events() if events is None else events
+    header = not append or not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with open(filename, 'a' if append else 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(["timestamp_utc", "ip", "tip_sha256", "tip", "section", "page"])
+        writer.writerows(store.ip_event(event_id) for event_id in events)
+    store.logger.info(f"{'Appended' if append else 'Exported'} {len(events)} IP events to {filename}")
+    return len(events)
+
+
+def _post(postings, index, entry):
+    # Appends entry to the posting list at postings[index]
+    current = postings[index]
+    if current is None:
+        postings[index] = entry
+    elif type(current) is int:
+        postings[index] = array('I', (current, entry))
+    else:
+        current.append(entry)
+
+
+def _last(posting):
+    if posting is None or type(posting) is int:
+        return posting
+    return posting[-1]
+
+
+def _entries(posting):
+    if posting is None:
+        return ()
+    if type(posting) is int:
+        return (posting,)
+    return posting
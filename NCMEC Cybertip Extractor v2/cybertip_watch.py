@@ -0,0 +1,363 @@
+import os
+import sys
+import time
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, BrokenExecutor, as_completed
+
+from cybertip_core import (setup_logging, parse_file, collect_files, is_supported, write_txt_exports,
+                           write_hash_manifest, DATA_FIELDS, FileResult)
+from cybertip_cache import ResultCache, DEFAULT_MAX_MB
+from cybertip_store import IndicatorStore, write_ip_timeline
+from cybertip_export import append_occurrences, EXPORT_EXTENSIONS
+from cybertip_metrics import Metrics, METRICS_FILE_NAME
+
+DEFAULT_POLL_INTERVAL = 5.0
+# A file must keep the same size and modification time for this long before it is read,
+# unless the OS reported that the writer closed it
+DEFAULT_SETTLE_SECONDS = 2.0
+# Even with inotify the folders are rescanned now and then, for events that were never
+# delivered (network shares, queue overflows, folders that were replaced)
+RESCAN_SECONDS = 300
+
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class PollingWatcher:
+    # Finds new and changed files by rescanning the folders; works on every OS and file system
+    def __init__(self, directories, recursive=True):
+        self.directories = directories
+        self.recursive = recursive
+        self.signatures = {}
+
+    def scan(self):
+        changed = []
+        current = {}
+        for path in collect_files(self.directories, self.recursive):
+            signature = file_signature(path)
+            if signature is None:
+                continue
+            current[path] = signature
+            if self.signatures.get(path) != signature:
+                changed.append(path)
+        self.signatures = current
+        return changed
+
+    def wait(self, timeout, stop_event):
+        # (path, finished writing) pairs; polling cannot tell whether a writer is done
+        if stop_event.wait(timeout):
+            return []
+        return [(path, False) for path in self.scan()]
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    # Linux inotify through libc, so new files are seen the moment their writer closes them
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, directories, recursive=True):
+        self.recursive = recursive
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.overflowed = False
+        for directory in directories:
+            self.add_tree(directory)
+
+    def add_tree(self, directory):
+        self.add_watch(directory)
+        if self.recursive:
+            for dirpath, dirnames, _ in os.walk(directory):
+                for name in dirnames:
+                    self.add_watch(os.path.join(dirpath, name))
+
+    def add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "Out of inotify watches; raise fs.inotify.max_user_watches or use --poll")
+            logging.getLogger("CyberTipLogger").warning(f"Cannot watch {directory}: {os.strerror(error)}")
+            return
+        self.watches[wd] = directory
+
+    def wait(self, timeout, stop_event):
+        # Wakes at least every second so a stop request is noticed
+        deadline = time.monotonic() + timeout
+        while not stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            ready, _, _ = select.select([self.fd], [], [], min(remaining, 1.0))
+            if ready:
+                return self.read_events()
+        return []
+
+    def read_events(self):
+        found = []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return found
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                # A new folder may already hold files (e.g. one moved in whole)
+                if self.recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add_tree(path)
+                    found.extend((found_path, False) for found_path in collect_files([path]))
+            elif is_supported(path) and mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                found.append((path, True))
+        return found
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(directories, recursive=True, use_inotify=True):
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories, recursive)
+        except (OSError, AttributeError) as e:
+            logging.getLogger("CyberTipLogger").warning(f"inotify unavailable ({e}); polling instead")
+    return PollingWatcher(directories, recursive)
+
+
+class WatchService:
+    # Keeps one indicator store for a case and feeds it every new or changed PDF/ZIP that shows
+    # up in the watched folders. Only new or changed files are parsed, each from a single read;
+    # a file whose content hash was already ingested is left out of the store, and the exports
+    # are brought up to date after each batch by appending what it added: new values to the TXT
+    # files, new events to the IP timeline and new rows to file_hashes.csv and the occurrences
+    # exports. Appended values and events are in arrival order; the TXT files and the timeline
+    # are rewritten in sorted order once, when the watch stops.
+    def __init__(self, directories, output_dir, workers=None, recursive=True, selective=True, cache_path=None,
+                 cache_max_mb=DEFAULT_MAX_MB, formats=(), interval=DEFAULT_POLL_INTERVAL,
+                 settle=DEFAULT_SETTLE_SECONDS, use_inotify=True, quiet=False, logger=None):
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.recursive = recursive
+        self.selective = selective
+        self.cache_path = cache_path
+        self.cache_max_mb = cache_max_mb
+        self.formats = formats
+        self.interval = interval
+        self.settle = settle
+        self.use_inotify = use_inotify
+        self.quiet = quiet
+        self.logger = logger or logging.getLogger("CyberTipLogger")
+        self.store = IndicatorStore(self.logger)
+        self.metrics = Metrics()
+        self.stop_event = threading.Event()
+        # path -> signature of the version that was last handled
+        self.handled = {}
+        # content sha256 -> first path seen with that content
+        self.file_hashes = {}
+        # path -> (signature, monotonic time it was first seen with that signature)
+        self.pending = {}
+        self.exported_counts = None
+        self.exported_events = 0
+        self.executor = None
+        self.start_time = time.time()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self, once=False):
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Append-only exports are rebuilt from the first scan (from the result cache, if enabled)
+        for name in ["file_hashes.csv"] + ["occurrences" + EXPORT_EXTENSIONS[fmt] for fmt in self.formats]:
+            path = os.path.join(self.output_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        watcher = make_watcher(self.directories, self.recursive, self.use_inotify)
+        self.logger.info(f"Watching {', '.join(self.directories)} with {type(watcher).__name__}")
+        if not self.quiet:
+            print(f"Watching {', '.join(self.directories)}; results go to {self.output_dir}. Press Ctrl+C to stop.",
+                  file=sys.stderr)
+        if self.workers > 1:
+            self.executor = self.make_executor()
+        try:
+            self.queue([(path, False) for path in collect_files(self.directories, self.recursive)])
+            last_rescan = time.monotonic()
+            while not self.stop_event.is_set():
+                self.process(self.ready())
+                if once and not self.pending:
+                    break
+                timeout = min(self.interval, self.settle) if self.pending else self.interval
+                if once:
+                    self.stop_event.wait(timeout)
+                    continue
+                changes = watcher.wait(timeout, self.stop_event)
+                if getattr(watcher, 'overflowed', False) or time.monotonic() - last_rescan >= RESCAN_SECONDS:
+                    watcher.overflowed = False
+                    last_rescan = time.monotonic()
+                    changes += [(path, False) for path in collect_files(self.directories, self.recursive)]
+                self.queue(changes)
+        finally:
+            watcher.close()
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+            if self.exported_counts is not None:
+                self.write_sorted()
+            self.logger.info(f"Watch stopped: {len(self.store.tip_hashes)} tip(s) from "
+                             f"{len(self.file_hashes)} file(s)")
+
+    def queue(self, changes):
+        now = time.monotonic()
+        for path, finished in changes:
+            signature = file_signature(path)
+            if signature is None or self.handled.get(path) == signature:
+                continue
+            if finished:
+                self.pending[path] = (signature, now - self.settle)
+            elif self.pending.get(path, (None,))[0] != signature:
+                self.pending[path] = (signature, now)
+
+    def ready(self):
+        # Pending files whose size and modification time have stopped changing
+        now = time.monotonic()
+        paths = []
+        for path, (signature, seen) in list(self.pending.items()):
+            current = file_signature(path)
+            if current is None:
+                del self.pending[path]
+            elif current != signature:
+                self.pending[path] = (current, now)
+            elif now - seen >= self.settle:
+                del self.pending[path]
+                paths.append(path)
+        return paths
+
+    def process(self, paths):
+        if not paths:
+            return
+        start = time.time()
+        for path in paths:
+            self.handled[path] = file_signature(path)
+        first_row = self.store.occurrence_count()
+        hashed = []
+        # Each file is read once, by its parse; duplicates are recognised by the SHA-256 that
+        # comes back with the result (a copy of a known tip is usually a cache hit anyway)
+        for result in self.parse(paths):
+            self.metrics.merge(result.metrics)
+            if result.error:
+                self.metrics.count('files_failed')
+                print(f"ERROR {result.path}: {result.error}", file=sys.stderr)
+                continue
+            first = self.file_hashes.get(result.sha256)
+            if first is not None:
+                self.metrics.count('files_duplicate')
+                self.logger.info(f"Skipped {result.path}: same content as {first} (SHA-256: {result.sha256})")
+                if not self.quiet:
+                    print(f"Skipped duplicate {result.path} (same as {first})", file=sys.stderr)
+                continue
+            self.file_hashes[result.sha256] = result.path
+            with self.metrics.timer('merge'):
+                self.store.add_result(result)
+            self.metrics.count('files_merged')
+            hashed.append(result)
+            if not self.quiet:
+                print(f"Added {result.path}  |  {result.md5}", file=sys.stderr)
+        if not hashed:
+            return
+        with self.metrics.timer('export'):
+            self.export(hashed, first_row)
+        if self.cache_path:
+            cache = ResultCache(self.cache_path, max_mb=self.cache_max_mb, logger=self.logger)
+            cache.evict()
+            cache.close()
+        self.logger.info(f"Ingested {len(hashed)} new file(s) in {time.time() - start:.2f} seconds; "
+                         f"store holds {self.store.occurrence_count()} occurrences in "
+                         f"{len(self.store.tip_hashes)} tip(s)")
+
+    def make_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=setup_logging)
+
+    def parse(self, files):
+        if self.executor is None:
+            for path in files:
+                yield parse_file(path, self.selective, self.cache_path, True)
+            return
+        futures = {self.executor.submit(parse_file, path, self.selective, self.cache_path, True): path
+                   for path in files}
+        broken = False
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenExecutor as e:
+                # A worker died (a crash in the PDF library or the OOM killer), taking the files
+                # still in the pool with it; they are recorded as failed and the watch goes on
+                broken = True
+                path = futures[future]
+                self.logger.error(f"Worker process died while {path} was queued or parsing: {e}")
+                yield FileResult(path, None, None, {}, 0.0, f"worker process died: {e}", {}, [], [], None)
+        if broken:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = self.make_executor()
+
+    def export(self, hashed, first_row):
+        if self.exported_counts is None:
+            # The first export writes all six files, even empty ones, like batch mode
+            self.write_sorted()
+        else:
+            added = {field: self.store.values(field)[self.exported_counts[field]:] for field in DATA_FIELDS
+                     if self.store.count(field) != self.exported_counts[field]}
+            if added:
+                write_txt_exports(added, self.output_dir, self.logger, append=True)
+            if len(self.store.timeline) != self.exported_events:
+                write_ip_timeline(self.store, os.path.join(self.output_dir, "ip_timeline.csv"),
+                                  range(self.exported_events, len(self.store.timeline)), append=True)
+        write_hash_manifest(hashed, os.path.join(self.output_dir, "file_hashes.csv"), append=True)
+        for fmt in self.formats:
+            append_occurrences(self.store, os.path.join(self.output_dir, "occurrences" + EXPORT_EXTENSIONS[fmt]),
+                               first_row, fmt, self.logger)
+        self.exported_counts = {field: self.store.count(field) for field in DATA_FIELDS}
+        self.exported_events = len(self.store.timeline)
+        self.metrics.write(os.path.join(self.output_dir, METRICS_FILE_NAME), time.time() - self.start_time,
+                           self.logger, command="watch", workers=self.workers, tips=len(self.store.tip_hashes),
+                           occurrences=self.store.occurrence_count())
+
+    def write_sorted(self):
+        # The TXT files and the IP timeline in full and sorted, as batch mode writes them
+        write_txt_exports(self.store.to_data(), self.output_dir, self.logger)
+        write_ip_timeline(self.store, os.path.join(self.output_dir, "ip_timeline.csv"))
@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+# The modules live next to this folder rather than in an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def tip_pdf(number):
+    # A one-page report with a few indicators of each kind, different for every number
+    import fitz
+    lines = [f"CyberTipline Report {number}",
+             "Section A: Reporting Electronic Service Provider (ESP) Information",
+             f"Email Address: suspect{number}@example.com", f"Phone: (312) 555-{number:04d}",
+             f"Screen/User Name: user{number}", "IP Address Type Date/Time",
+             f"IP Address: 73.{number // 250}.{number % 250}.10", "Login",
+             f"03-{number % 28 + 1:02d}-2024 10:15:00 UTC", f"MD5: {number:032x}",
+             "Section D: Law Enforcement Contact Information", "Email: cybertipline@ncmec.org"]
+    doc = fitz.open()
+    doc.new_page().insert_text((36, 36), "\n".join(lines), fontsize=7)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def build_corpus(directory, tips, bundle=False):
+    # Writes tips as loose PDFs; with bundle, the first three go into one ZIP instead (one of
+    # them inside a nested ZIP, next to an image that is not a report)
+    from cybertip_core import collect_files
+    os.makedirs(directory, exist_ok=True)
+    first = 0
+    if bundle:
+        members = [("reports/tip_000000.pdf", tip_pdf(0)), ("media/upload_0001.jpg", os.urandom(4096)),
+                   ("reports/nested_0000.zip", _zip_bytes([("tip_000001.pdf", tip_pdf(1))])),
+                   ("tip_000002.pdf", tip_pdf(2))]
+        with open(os.path.join(directory, "bundle_0000.zip"), 'wb') as f:
+            f.write(_zip_bytes(members))
+        first = 3
+    for number in range(first, tips):
+        with open(os.path.join(directory, f"tip_{number:06d}.pdf"), 'wb') as f:
+            f.write(tip_pdf(number))
+    return collect_files([directory])
+
+
+@pytest.fixture(scope="session")
+def make_corpus():
+    return build_corpus
@@ -0,0 +1,38 @@
+import random
+
+import cybertip_export
+from cybertip_export import external_sort
+
+
+def test_external_sort_merges_in_passes(tmp_path, monkeypatch):
+    # 40 runs with a fan-in of 4 takes several merge passes
+    monkeypatch.setattr(cybertip_export, "MERGE_FAN_IN", 4)
+    rng = random.Random(3)
+    records = [(rng.randrange(10 ** 6), f"value{index}") for index in range(40_000)]
+    read_run = cybertip_export._read_run
+    open_runs = []
+    most_open = 0
+
+    def counting_read_run(path):
+        nonlocal most_open
+        open_runs.append(path)
+        most_open = max(most_open, len(open_runs))
+        try:
+            yield from read_run(path)
+        finally:
+            open_runs.remove(path)
+
+    monkeypatch.setattr(cybertip_export, "_read_run", counting_read_run)
+    assert list(external_sort(iter(records), 1000, str(tmp_path))) == sorted(records)
+    assert most_open == 4
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_external_sort_removes_runs_when_stopped_early(tmp_path, monkeypatch):
+    monkeypatch.setattr(cybertip_export, "MERGE_FAN_IN", 4)
+    records = [(index % 977, index) for index in range(10_000)]
+    ordered = external_sort(iter(records), 1000, str(tmp_path))
+    assert next(ordered) == (0, 0)
+    assert list(tmp_path.iterdir())
+    ordered.close()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import threading
+import multiprocessing
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import cybertip_pipeline
+from cybertip_cli import build_parser, pipeline_options
+from cybertip_pipeline import IngestPipeline, pipeline_options_from_env
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory, make_corpus):
+    return make_corpus(str(tmp_path_factory.mktemp("tips")), tips=30)
+
+
+def _cancel_after_first(files, workers, **options):
+    cancel_event = threading.Event()
+    pipeline = IngestPipeline(files, workers, cancel_event, metrics=False, **options)
+    results = []
+    for result in pipeline:
+        results.append(result)
+        cancel_event.set()
+    return pipeline, results
+
+
+def test_all_files_are_parsed(corpus):
+    results = list(IngestPipeline(corpus, 1, read_ahead=4))
+    assert sorted(result.path for result in results) == sorted(corpus)
+    assert not [result for result in results if result.error]
+
+
+def test_cancel_drops_queued_files(corpus, monkeypatch):
+    parse_file = cybertip_pipeline.parse_file
+
+    def slow_parse_file(*args):
+        time.sleep(0.05)
+        return parse_file(*args)
+
+    monkeypatch.setattr(cybertip_pipeline, "parse_file", slow_parse_file)
+    pipeline, results = _cancel_after_first(corpus, 1, read_ahead=16, result_depth=1)
+    # Besides the first result only files already with the worker or waiting for the merger may arrive
+    assert len(results) <= 1 + pipeline.parse_depth + 1
+    assert len(results) < len(corpus)
+
+
+def test_cancel_with_worker_processes(corpus):
+    pipeline, results = _cancel_after_first(corpus, 2, read_ahead=16, result_depth=1)
+    assert len(results) <= 1 + pipeline.parse_depth + 1
+    assert len(results) < len(corpus)
+
+
+def _crash(*args):
+    # What a MuPDF segfault or the OOM killer does to a worker
+    os._exit(1)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork so the worker runs the patched parse_file")
+def test_worker_crash_is_raised(corpus, monkeypatch):
+    monkeypatch.setattr(cybertip_pipeline, "parse_file", _crash)
+    outcome = []
+
+    def consume():
+        try:
+            list(IngestPipeline(corpus, 2, mp_context=multiprocessing.get_context("fork"), read_ahead=2))
+        except BaseException as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    thread.join(60)
+    assert not thread.is_alive(), "the pipeline hung after a worker died"
+    assert len(outcome) == 1 and isinstance(outcome[0], BrokenProcessPool)
+
+
+def test_depth_options():
+    args = build_parser().parse_args(["batch", "tips", "--parse-depth", "3", "--result-depth", "5"])
+    options = pipeline_options(args)
+    assert options['parse_depth'] == 3 and options['result_depth'] == 5
+    pipeline = IngestPipeline([], 4, **options)
+    assert pipeline.parse_depth == 3 and pipeline.results.maxsize == 5
+    assert IngestPipeline([], 4).parse_depth == 8
+
+
+def test_options_from_env(monkeypatch):
+    monkeypatch.setenv("CYBERTIP_PARSE_DEPTH", "6")
+    monkeypatch.setenv("CYBERTIP_READ_BUFFER_MB", "12.5")
+    monkeypatch.setenv("CYBERTIP_RESULT_DEPTH", "many")
+    assert pipeline_options_from_env() == {'parse_depth': 6, 'buffer_mb': 12.5}
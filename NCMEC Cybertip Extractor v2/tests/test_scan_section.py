@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from cybertip_core import CyberTipParser, SectionStream, scan_section
+from cybertip_reference import reference_scan_section
+
+FIELDS = ('hashes', 'ips', 'emails', 'phones', 'usernames')
+
+
+def _phone_digits(rng):
+    return f"{rng.randrange(201, 990)}{rng.randrange(200, 999)}{rng.randrange(10000):04d}"
+
+
+def _format_phone(rng, digits):
+    return rng.choice([
+        f"({digits[:3]}) {digits[3:6]}-{digits[6:]}",
+        f"{digits[:3]}-{digits[3:6]}-{digits[6:]}",
+        f"{digits[:3]}.{digits[3:6]}.{digits[6:]}",
+        f"+1 {digits[:3]}-{digits[3:6]}-{digits[6:]}",
+        digits,
+    ])
+
+
+def _hash(rng, inside=""):
+    text = "".join(rng.choice("0123456789abcdef") for _ in range(32 - len(inside)))
+    at = rng.randrange(len(text) + 1)
+    text = text[:at] + inside + text[at:]
+    return text.upper() if rng.random() < 0.2 else text
+
+
+def _timestamp(rng, valid=True):
+    if valid:
+        return (f"{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}-{rng.randrange(2015, 2026)} "
+                f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d} UTC")
+    return rng.choice(["02-30-2024 10:00:00 UTC", "13-01-2024 10:00:00 UTC", "12-31-2023 24:00:00 UTC",
+                       "00-10-2022 08:15:00 UTC", "04-31-2021 23:59:60 UTC"])
+
+
+def _ip(rng):
+    return ".".join(str(rng.randrange(256)) for _ in range(4))
+
+
+def adversarial_lines(rng):
+    # A few lines that exercise one awkward case each; the caller keeps every phone next to
+    # the hash it may be part of and every "IP Address" next to a timestamp
+    digits = _phone_digits(rng)
+    case = rng.randrange(12)
+    if case == 0:
+        # Phone whose digits also appear inside a hash: dropped as part of the hash
+        return [f"MD5: {_hash(rng, digits)}", f"Phone: {_format_phone(rng, digits)}"]
+    if case == 1:
+        return [f"Phone: {_format_phone(rng, digits)}", f"Hash: {_hash(rng)}"]
+    if case == 2:
+        return [f"Phone: {_format_phone(rng, rng.choice(['2177829030', '8774462632']))}"]
+    if case == 3:
+        user = rng.choice(["agent", "Tips", "x.y", "case+1"])
+        return [f"Email: {user}@{rng.choice(['fbi.gov', 'NCMEC.ORG', 'ncmec.org', 'ilag.gov', 'state.gov.uk'])}",
+                f"Contact: {user}@{rng.choice(['example.com', 'mail.example.org', 'gov-mail.net', 'b.co.'])}"]
+    if case == 4:
+        return [f"IP Address: {_ip(rng)}", f"Date/Time: {_timestamp(rng, valid=rng.random() < 0.4)}"]
+    if case == 5:
+        return [f"IP Address {_ip(rng)} Upload {_timestamp(rng)}"]
+    if case == 6:
+        return [f"IP Address {_ip(rng)} Upload {rng.randrange(1, 13):02d}-2024 10:00:00 UTC "
+                f"then {_timestamp(rng)}"]
+    if case == 7:
+        key = rng.choice(["Screen/User Name:", "Display Name:", "ESP User ID:"])
+        return [f"{key} {rng.choice(['bob_1', 'alice@example.com', '12345', '(none)'])}", f"{key}", "next_token"]
+    if case == 8:
+        # Near-misses: 31/33 hex characters, phone digits glued to letters or other digits
+        return [f"{_hash(rng)[:31]} {_hash(rng)}a", f"ID{digits}", f"{digits}5", f"x{_format_phone(rng, digits)}"]
+    if case == 9:
+        return [f"SHA1: {_hash(rng)}{_hash(rng)[:8]}", f"SHA256: {_hash(rng)}{_hash(rng)}"]
+    if case == 10:
+        return [f"{_hash(rng)} {_hash(rng)} ({digits[:3]}){digits[3:6]}-{digits[6:]}"]
+    return [rng.choice(["Incident Type: Apparent Child Pornography", "Lorem ipsum dolor sit amet",
+                        "Additional Information:", "   ", "Page 3 of 12"])]
+
+
+def _as_sets(found):
+    return {key: set(values) for key, values in found.items() if values and key in FIELDS}
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_scan_section_matches_reference(seed):
+    rng = random.Random(seed)
+    lines = [line for _ in range(rng.randrange(1, 60)) for line in adversarial_lines(rng)]
+    section_text = "\n".join(lines).strip()
+    assert _as_sets(scan_section(section_text)) == _as_sets(reference_scan_section(section_text))
+
+
+def test_chunked_section_matches_reference():
+    # A section several chunks long. Chunks are cut between pages, so every page ends in the
+    # middle of a multi-line indicator (an "IP Address" before its timestamp, a hash before a
+    # phone made of its digits) that the overlap carried into the next chunk has to complete.
+    rng = random.Random(7)
+    pages = []
+    size = 0
+    tail = []
+    while size < SectionStream.CHUNK_CHARS * 3:
+        lines = list(tail)
+        page_size = rng.randrange(50_000, 400_000)
+        while sum(len(line) + 1 for line in lines) < page_size:
+            lines.extend(adversarial_lines(rng) + ["filler " * rng.randrange(50, 600)])
+        digits = _phone_digits(rng)
+        lines += [f"IP Address: {_ip(rng)}", f"MD5: {_hash(rng, digits)}"]
+        tail = [f"Date/Time: {_timestamp(rng)}", f"Phone: {_format_phone(rng, digits)}"]
+        pages.append("\n".join(lines))
+        size += len(pages[-1])
+    pages.append("\n".join(tail))
+    parser = CyberTipParser(selective=False)
+    parser.extract_from_pages(["Section A: Reporting Electronic Service Provider (ESP)\n" + pages[0]] + pages[1:])
+    assert _as_sets(parser.data) == _as_sets(reference_scan_section("\n".join(pages).strip()))
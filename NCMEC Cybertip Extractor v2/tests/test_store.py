@@ -0,0 +1,26 @@
+import random
+
+from cybertip_core import DATA_FIELDS, value_sort_key
+from cybertip_store import SortedValues
+
+
+def _value(rng, field):
+    if field == 'ips':
+        return (f"{rng.randrange(256)}.{rng.randrange(256)}.0.{rng.randrange(256)} → "
+                f"2024-{rng.randrange(1, 13):02d}-01 10:00:{rng.randrange(60):02d}")
+    return rng.choice(["Bob", "alice", "bob", "Carol", "dave"]) + str(rng.randrange(1000))
+
+
+def test_sorted_values_stay_in_display_order():
+    rng = random.Random(5)
+    for field in DATA_FIELDS:
+        key = value_sort_key(field)
+        values = SortedValues(key)
+        added = []
+        # Small batches are inserted one by one, large ones merged in one pass
+        for size in (1, 5, SortedValues.INSERT_LIMIT + 1, 3, 200, 0, 2):
+            batch = [_value(rng, field) for _ in range(size)]
+            values.add(batch)
+            added += batch
+            assert values.items == sorted(added, key=key)
+        assert values.search("bob") == sorted((value for value in added if "bob" in value.lower()), key=key)
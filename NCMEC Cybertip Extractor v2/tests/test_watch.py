@@ -0,0 +1,79 @@
+import os
+import sys
+import shutil
+
+import pytest
+
+import cybertip_core
+import cybertip_watch
+from cybertip_watch import WatchService
+
+
+def test_each_file_is_read_once_and_copies_are_skipped(tmp_path, monkeypatch, make_corpus):
+    intake = tmp_path / "intake"
+    files = make_corpus(str(intake), tips=3)
+    shutil.copy(files[0], intake / "renamed_copy.pdf")
+    reads = []
+    map_file = cybertip_core.map_file
+
+    def counting_map_file(path):
+        reads.append(os.path.basename(path))
+        return map_file(path)
+
+    monkeypatch.setattr(cybertip_core, "map_file", counting_map_file)
+    service = WatchService([str(intake)], str(tmp_path / "out"), workers=1, settle=0, use_inotify=False, quiet=True)
+    service.run(once=True)
+    assert sorted(reads) == sorted(os.listdir(intake))
+    assert len(service.store.tip_hashes) == 3
+    assert len(service.file_hashes) == 3
+    assert service.metrics.counters['files_duplicate'] == 1
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_exports_are_appended_and_sorted_at_stop(tmp_path, make_corpus):
+    files = make_corpus(str(tmp_path / "intake"), tips=4)
+    out = tmp_path / "out"
+    batch = tmp_path / "batch"
+    out.mkdir()
+    batch.mkdir()
+    service = WatchService([str(tmp_path / "intake")], str(out), workers=1, settle=0, use_inotify=False, quiet=True)
+    # Later tips first, so sorting would put the second batch's values in front
+    service.process(files[2:])
+    first = {name: _read(out / name) for name in ("emails.txt", "ip_timeline.csv")}
+    service.process(files[:2])
+    # The second batch only added lines after the ones already written
+    for name, lines in first.items():
+        grown = _read(out / name)
+        assert grown[:len(lines)] == lines and len(grown) > len(lines)
+    assert len(_read(out / "ip_timeline.csv")) == len(service.store.timeline) + 1
+    service.write_sorted()
+    WatchService([], str(batch), workers=1, quiet=True).process(files)
+    for name in ("emails.txt", "ips.txt", "phones.txt", "ip_timeline.csv"):
+        assert _read(out / name) == _read(batch / name)
+
+
+def _crash_on_first_tip(path, *args):
+    if path.endswith("tip_000000.pdf"):
+        os._exit(1)
+    return cybertip_core.parse_file(path, *args)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork so the workers see the patched parse_file")
+def test_worker_crash_is_recorded_and_the_pool_replaced(tmp_path, monkeypatch, make_corpus):
+    files = make_corpus(str(tmp_path / "intake"), tips=4)
+    out = tmp_path / "out"
+    out.mkdir()
+    monkeypatch.setattr(cybertip_watch, "parse_file", _crash_on_first_tip)
+    service = WatchService([str(tmp_path / "intake")], str(out), workers=2, quiet=True)
+    service.executor = service.make_executor()
+    try:
+        service.process(files[:1])
+        assert service.metrics.counters['files_failed'] == 1
+        service.process(files[1:])
+    finally:
+        service.executor.shutdown()
+    assert len(service.store.tip_hashes) == 3
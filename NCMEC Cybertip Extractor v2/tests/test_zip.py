@@ -0,0 +1,30 @@
+import logging
+
+import pytest
+
+from cybertip_core import CyberTipParser, extract_file
+
+
+@pytest.fixture
+def bundle(tmp_path, make_corpus):
+    files = make_corpus(str(tmp_path), tips=3, bundle=True)
+    return [path for path in files if path.endswith(".zip")][0]
+
+
+def test_large_members_are_spilled_to_disk(bundle, monkeypatch):
+    in_memory = extract_file(bundle, metrics=True)
+    monkeypatch.setattr(CyberTipParser, "MEMBER_MEMORY_MB", 0)
+    spilled = extract_file(bundle, metrics=True)
+    # Both PDFs, the nested ZIP and the PDF inside it went through temporary files
+    assert spilled.metrics['counters']['zip_members_spilled'] == 4
+    assert spilled.members == in_memory.members and len(spilled.members) == 3
+    assert spilled.data == in_memory.data
+    assert spilled.occurrences == in_memory.occurrences
+
+
+def test_oversized_members_are_skipped(bundle, monkeypatch, caplog):
+    monkeypatch.setattr(CyberTipParser, "MAX_MEMBER_MB", 0)
+    with caplog.at_level(logging.WARNING, logger="CyberTipLogger"):
+        result = extract_file(bundle)
+    assert result.members == [] and not any(result.data.values())
+    assert "decompresses to" in caplog.text